@@ -1,21 +1,19 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
+from app.core.lazy import Lazy
 
-class Settings(BaseSettings):
-    DB_HOST: str
-    DB_PORT: int
-    DB_NAME: str
-    DB_USER: str
-    DB_PASS: str
-    
-    @property
-    def DTABASE_URL(self):
-        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
-    
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        extra="ignore",
-    )
-    
+if TYPE_CHECKING:
+    from app.core.settings import Settings
 
-settings = Settings()
+
+@lru_cache
+def get_settings() -> "Settings":
+    # pydantic-settings is imported, and the environment read, only once
+    # something actually needs a setting.
+    from app.core.settings import Settings
+
+    return Settings()
+
+
+settings: "Settings" = Lazy(get_settings)
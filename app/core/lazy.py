@@ -0,0 +1,43 @@
+from typing import Any, Callable
+
+
+_UNSET = object()
+
+
+class Lazy:
+    """Stands in for the object `factory` returns, building it on first use.
+
+    Attribute access, assignment and calls go to the real object, so a
+    module-level `name = Lazy(...)` can replace an eagerly built singleton
+    without touching its call sites.
+    """
+
+    __slots__ = ("_factory", "_value")
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", _UNSET)
+
+    def _resolve(self) -> Any:
+        value = object.__getattribute__(self, "_value")
+        if value is _UNSET:
+            value = object.__getattribute__(self, "_factory")()
+            object.__setattr__(self, "_value", value)
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._resolve(), name, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        value = object.__getattribute__(self, "_value")
+        return f"Lazy({'<unresolved>' if value is _UNSET else repr(value)})"
+
+
+def is_resolved(lazy: Lazy) -> bool:
+    return object.__getattribute__(lazy, "_value") is not _UNSET
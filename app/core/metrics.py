@@ -0,0 +1,205 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 1000)
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: tuple):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series: dict[str, list] = {}
+
+    def observe(self, label: str, value: float):
+        # [bucket counts..., sum, count]
+        series = self.series.get(label)
+        if series is None:
+            series = self.series[label] = [0] * len(self.buckets) + [0.0, 0]
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label, series in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{method="{label}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{method="{label}",le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{method="{label}"}} {series[-2]}')
+            lines.append(f'{self.name}_count{{method="{label}"}} {series[-1]}')
+        return lines
+
+
+duration_seconds = Histogram("bank_service_duration_seconds", "Wall time of service methods.", LATENCY_BUCKETS)
+queries_total = Histogram("bank_service_queries", "Database round trips per service call.", COUNT_BUCKETS)
+rows_total = Histogram("bank_service_rows", "Rows returned or affected per service call.", COUNT_BUCKETS)
+commit_seconds = Histogram("bank_service_commit_seconds", "Commit latency inside service methods.", LATENCY_BUCKETS)
+
+HISTOGRAMS = (duration_seconds, queries_total, rows_total, commit_seconds)
+
+
+@dataclass
+class OperationStats:
+    queries: int = 0
+    rows: int = 0
+    commit_seconds: float = 0.0
+
+
+_current: ContextVar[OperationStats | None] = ContextVar("service_operation", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def record_rows(rows: int, queries: int = 1):
+    """Counts work the cursor events cannot see, such as COPY on the raw driver connection."""
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += queries
+        stats.rows += rows
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentedSession(AsyncSession):
+    async def commit(self):
+        started = time.perf_counter()
+        try:
+            await super().commit()
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.commit_seconds += time.perf_counter() - started
+
+
+def instrumented(method):
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        parent = _current.get()
+        stats = OperationStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+
+            duration_seconds.observe(name, elapsed)
+            queries_total.observe(name, stats.queries)
+            rows_total.observe(name, stats.rows)
+            if stats.commit_seconds:
+                commit_seconds.observe(name, stats.commit_seconds)
+
+            # Nested service calls also count towards the caller.
+            if parent is not None:
+                parent.queries += stats.queries
+                parent.rows += stats.rows
+                parent.commit_seconds += stats.commit_seconds
+
+            if elapsed * 1000 >= settings.SLOW_OPERATION_MS:
+                logger.warning(
+                    "Slow operation %s: %.1f ms, %d queries, %d rows, commit %.1f ms",
+                    name, elapsed * 1000, stats.queries, stats.rows, stats.commit_seconds * 1000,
+                )
+
+    return wrapper
+
+
+def instrument_service(cls):
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        setattr(cls, attribute, instrumented(value))
+    return cls
+
+
+def snapshot() -> dict[str, dict[str, list]]:
+    return {
+        histogram.name: {label: list(series) for label, series in histogram.series.items()}
+        for histogram in HISTOGRAMS
+    }
+
+
+def merge_snapshot(other: dict[str, dict[str, list]]):
+    # Adds histograms recorded elsewhere, e.g. in a worker process.
+    for histogram in HISTOGRAMS:
+        for label, series in other.get(histogram.name, {}).items():
+            current = histogram.series.get(label)
+            if current is None:
+                current = histogram.series[label] = [0] * len(histogram.buckets) + [0.0, 0]
+            for index, value in enumerate(series):
+                current[index] += value
+
+
+def render_prometheus() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def dump_metrics(path: str):
+    with open(path, "w") as output:
+        output.write(render_prometheus())
+
+
+async def _handle_scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    request_line = await reader.readline()
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+
+    if request_line.split(b" ")[1:2] == [b"/metrics"]:
+        body = render_prometheus().encode()
+        status = b"200 OK"
+    else:
+        body = b"not found\n"
+        status = b"404 Not Found"
+
+    writer.write(
+        b"HTTP/1.1 " + status + b"\r\n"
+        b"Content-Type: text/plain; version=0.0.4\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+        b"Connection: close\r\n\r\n" + body
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def serve_metrics(host: str = "0.0.0.0", port: int = 9100) -> asyncio.Server:
+    return await asyncio.start_server(_handle_scrape, host, port)
@@ -0,0 +1,90 @@
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import total_ordering
+
+
+CENT = Decimal("0.01")
+
+
+def quantize_money(amount: Decimal) -> Decimal:
+    return Decimal(amount).quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+
+def to_cents(amount: Decimal) -> int:
+    return int((Decimal(amount) * 100).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def apply_rate(cents: int, rate: Decimal) -> int:
+    """cents * rate rounded half-to-even to a whole cent."""
+    return int((cents * Decimal(rate)).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+@total_ordering
+class Money:
+    """An amount of money as a whole number of cents.
+
+    Arithmetic between Money values is plain integer arithmetic; the only
+    rounding happens when a Decimal is converted in or a rate is applied,
+    and both round half to even.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0):
+        self.cents = int(cents)
+
+    @classmethod
+    def of(cls, amount: "Money | Decimal | int | str") -> "Money":
+        if isinstance(amount, Money):
+            return amount
+        return cls(to_cents(Decimal(amount)))
+
+    def to_decimal(self) -> Decimal:
+        return from_cents(self.cents)
+
+    def __add__(self, other: "Money") -> "Money":
+        if not isinstance(other, Money):
+            return NotImplemented
+        return Money(self.cents + other.cents)
+
+    def __sub__(self, other: "Money") -> "Money":
+        if not isinstance(other, Money):
+            return NotImplemented
+        return Money(self.cents - other.cents)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __mul__(self, rate: Decimal | int) -> "Money":
+        if isinstance(rate, int):
+            return Money(self.cents * rate)
+        if isinstance(rate, Decimal):
+            return Money(apply_rate(self.cents, rate))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.cents == other.cents
+
+    def __lt__(self, other: "Money") -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.cents < other.cents
+
+    def __hash__(self) -> int:
+        return hash(self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
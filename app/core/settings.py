@@ -0,0 +1,63 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    DB_HOST: str
+    DB_PORT: int
+    DB_NAME: str
+    DB_USER: str
+    DB_PASS: str
+    
+    DB_APPLICATION_NAME: str = "bank_simulation"
+    DB_PGBOUNCER: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    
+    DB_OLTP_POOL_SIZE: int = 20
+    DB_OLTP_MAX_OVERFLOW: int = 30
+    DB_OLTP_POOL_TIMEOUT: float = 5.0
+    DB_OLTP_STATEMENT_TIMEOUT_MS: int = 5_000
+    
+    DB_BATCH_POOL_SIZE: int = 4
+    DB_BATCH_MAX_OVERFLOW: int = 0
+    DB_BATCH_POOL_TIMEOUT: float = 60.0
+    DB_BATCH_STATEMENT_TIMEOUT_MS: int = 0
+    
+    DB_REPORTING_POOL_SIZE: int = 5
+    DB_REPORTING_MAX_OVERFLOW: int = 5
+    DB_REPORTING_POOL_TIMEOUT: float = 30.0
+    DB_REPORTING_STATEMENT_TIMEOUT_MS: int = 60_000
+    
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+    
+    COMISSION_SHARDS: int = 16
+    BANK_STATS_SHARDS: int = 16
+    REFERENCE_DATA_REFRESH_INTERVAL: float = 5.0
+    
+    SLOW_OPERATION_MS: float = 200.0
+    
+    CLIENT_CACHE_SIZE: int = 100_000
+    CLIENT_CACHE_TTL: float = 600.0
+    CLIENT_CACHE_NEGATIVE_TTL: float = 30.0
+    
+    IDEMPOTENCY_TTL: float = 86_400.0
+    IDEMPOTENCY_CACHE_SIZE: int = 100_000
+    
+    ACCRUAL_CHUNK_SIZE: int = 10_000
+    
+    RECONCILE_CHUNK_SIZE: int = 50_000
+    # Transactions younger than this are left for the next run, so rows that
+    # commit late are not skipped by the watermark.
+    RECONCILE_LAG_SECONDS: float = 300.0
+    
+    @property
+    def DTABASE_URL(self):
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from typing import Any
+
+from sqlalchemy import DateTime, Table, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import record_rows
+
+
+_MISSING = object()
+_NOW = object()
+
+
+def _client_default(column) -> Any:
+    default = column.default
+    if default is None:
+        return _MISSING
+    if default.is_scalar:
+        return default.arg
+    # func.now() defaults are evaluated by the ORM as SQL; COPY needs a value,
+    # which flush() reads from the database so it matches now() there.
+    if default.is_clause_element and isinstance(column.type, DateTime):
+        return _NOW
+    return _MISSING
+
+
+async def reserve_ids(session: AsyncSession, model, count: int) -> list[int]:
+    """Take `count` ids from the sequence behind model's id column, so rows
+    can be COPYed with keys that other rows already reference."""
+    if not count:
+        return []
+
+    stmt = await session.scalars(
+        select(func.nextval(func.pg_get_serial_sequence(model.__table__.name, "id")))
+        .select_from(func.generate_series(1, count))
+    )
+
+    return list(stmt)
+
+
+class BulkWriter:
+    """Buffers rows for one table and writes them with COPY (asyncpg) or a
+    multi-row INSERT, bypassing the ORM unit of work.
+
+    Rows are plain dicts keyed by column name. Columns left out fall back to
+    their scalar or now() defaults; autoincrement keys are filled in by the
+    database. Flushing does not commit.
+    """
+
+    def __init__(self, session: AsyncSession, model, buffer_size: int = 10_000):
+        self.session = session
+        self.table: Table = model.__table__
+        self.buffer_size = buffer_size
+        self.rows: list[dict] = []
+        self.written = 0
+        self._processors: dict[str, Any] = {}
+
+    async def add(self, row: dict):
+        self.rows.append(row)
+
+        if len(self.rows) >= self.buffer_size:
+            await self.flush()
+
+    async def add_many(self, rows: list[dict]):
+        for row in rows:
+            await self.add(row)
+
+    def _columns(self, rows: list[dict]) -> list:
+        keys = set().union(*rows)
+        return [
+            column for column in self.table.columns
+            if column.name in keys or _client_default(column) is not _MISSING
+        ]
+
+    def _processor(self, column, dialect):
+        if column.name not in self._processors:
+            self._processors[column.name] = column.type.bind_processor(dialect)
+        return self._processors[column.name]
+
+    async def flush(self):
+        if not self.rows:
+            return
+
+        rows, self.rows = self.rows, []
+        columns = self._columns(rows)
+        defaults = {column.name: _client_default(column) for column in columns}
+
+        connection = await self.session.connection()
+
+        if _NOW in defaults.values():
+            # localtimestamp is fixed for the transaction, like now().
+            now = await connection.scalar(select(func.localtimestamp()))
+            defaults = {name: now if value is _NOW else value for name, value in defaults.items()}
+
+        if connection.dialect.driver == "asyncpg":
+            processors = {column.name: self._processor(column, connection.dialect) for column in columns}
+            records = []
+            for row in rows:
+                record = []
+                for column in columns:
+                    value = row.get(column.name, defaults[column.name])
+                    if value is _MISSING:
+                        value = None
+                    processor = processors[column.name]
+                    record.append(processor(value) if processor and value is not None else value)
+                records.append(tuple(record))
+
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                self.table.name,
+                records=records,
+                columns=[column.name for column in columns],
+                schema_name=self.table.schema,
+            )
+            # COPY bypasses SQLAlchemy, so the cursor events never see these rows.
+            record_rows(len(records))
+        else:
+            # Rows may leave out different columns; each key set gets its own
+            # executemany so no row's values land under another's columns.
+            groups = defaultdict(list)
+            for row in rows:
+                values = {
+                    column.name: row.get(column.name, defaults[column.name])
+                    for column in columns
+                    if row.get(column.name, defaults[column.name]) is not _MISSING
+                }
+                groups[tuple(values)].append(values)
+            for values in groups.values():
+                await connection.execute(insert(self.table), values)
+
+        self.written += len(rows)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.flush()
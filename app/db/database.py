@@ -1,26 +1,199 @@
+import itertools
+import logging
+import time
+from enum import Enum
 from typing import AsyncIterator
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
-from core.config import settings
+from app.core.config import settings
+from app.core.lazy import Lazy
+from app.core.metrics import InstrumentedSession, instrument_engine
 
 
-DATABASE_URL = settings.DTABASE_URL
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(DATABASE_URL)
 
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+class EngineProfile(str, Enum):
+    oltp = "oltp"
+    batch = "batch"
+    reporting = "reporting"
 
 
-async def get_session() -> AsyncIterator[AsyncSession]:
-    async with async_session_maker() as session:
+def _pgbouncer_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(profile: EngineProfile, url: str | None = None) -> dict:
+    url = url or settings.DTABASE_URL
+    prefix = f"DB_{profile.name.upper()}_"
+    statement_timeout = getattr(settings, prefix + "STATEMENT_TIMEOUT_MS")
+
+    server_settings = {
+        "application_name": f"{settings.DB_APPLICATION_NAME}:{profile.value}",
+    }
+
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling hands every transaction a different server
+        # connection, so named prepared statements cannot be reused, and
+        # pgbouncer only forwards a few startup parameters.
+        return {
+            "url": make_url(url).update_query_dict({"prepared_statement_cache_size": "0"}),
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": _pgbouncer_statement_name,
+                "server_settings": server_settings,
+            },
+        }
+
+    if statement_timeout:
+        server_settings["statement_timeout"] = str(statement_timeout)
+    if profile == EngineProfile.reporting:
+        server_settings["default_transaction_read_only"] = "on"
+
+    return {
+        "url": make_url(url).update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+        ),
+        "pool_size": getattr(settings, prefix + "POOL_SIZE"),
+        "max_overflow": getattr(settings, prefix + "MAX_OVERFLOW"),
+        "pool_timeout": getattr(settings, prefix + "POOL_TIMEOUT"),
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
+
+
+_engines: dict[EngineProfile, AsyncEngine] = {}
+_session_makers: dict[EngineProfile, async_sessionmaker[AsyncSession]] = {}
+
+
+def get_engine(profile: EngineProfile = EngineProfile.oltp) -> AsyncEngine:
+    if profile not in _engines:
+        _engines[profile] = create_async_engine(**engine_options(profile))
+        instrument_engine(_engines[profile])
+
+    return _engines[profile]
+
+
+def get_session_maker(profile: EngineProfile = EngineProfile.oltp) -> async_sessionmaker[AsyncSession]:
+    if profile not in _session_makers:
+        _session_makers[profile] = async_sessionmaker(
+            get_engine(profile),
+            class_=InstrumentedSession,
+            expire_on_commit=False,
+        )
+
+    return _session_makers[profile]
+
+
+async def dispose_engines():
+    for engine in _engines.values():
+        await engine.dispose()
+
+    if _replica_router is not None:
+        await _replica_router.dispose()
+
+
+# Built on first use, so importing models or services never connects or
+# loads the driver.
+engine: AsyncEngine = Lazy(lambda: get_engine(EngineProfile.oltp))
+
+async_session_maker: async_sessionmaker[AsyncSession] = Lazy(lambda: get_session_maker(EngineProfile.oltp))
+
+
+class ReplicaRouter:
+    """Hands out sessions on read replicas whose replication lag is within
+    DB_REPLICA_MAX_LAG_SECONDS, falling back to the primary reporting pool.
+    """
+
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, urls: list[str], max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.engines = [
+            create_async_engine(**engine_options(EngineProfile.reporting, url))
+            for url in urls
+        ]
+        for engine in self.engines:
+            instrument_engine(engine)
+        self.session_makers = [
+            async_sessionmaker(engine, class_=InstrumentedSession, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self._lag: dict[int, tuple[float, float]] = {}
+        self._order = itertools.cycle(range(len(self.session_makers)))
+
+    async def _replica_lag(self, index: int) -> float:
+        checked_at, lag = self._lag.get(index, (0.0, float("inf")))
+        if time.monotonic() - checked_at < self.check_interval:
+            return lag
+
+        try:
+            async with self.session_makers[index]() as session:
+                lag = float(await session.scalar(self.LAG_QUERY))
+        except Exception:
+            logger.warning("Read replica #%d is unreachable", index, exc_info=True)
+            lag = float("inf")
+
+        self._lag[index] = (time.monotonic(), lag)
+        return lag
+
+    async def session_maker(self, max_lag: float | None = None) -> async_sessionmaker[AsyncSession]:
+        max_lag = self.max_lag if max_lag is None else max_lag
+
+        for _ in range(len(self.session_makers)):
+            index = next(self._order)
+            if await self._replica_lag(index) <= max_lag:
+                return self.session_makers[index]
+
+        return get_session_maker(EngineProfile.reporting)
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
+
+
+_replica_router: ReplicaRouter | None = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _replica_router
+
+    if _replica_router is None:
+        _replica_router = ReplicaRouter(
+            settings.DB_REPLICA_URLS,
+            max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+            check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+        )
+
+    return _replica_router
+
+
+async def get_read_session(max_lag: float | None = None) -> AsyncIterator[AsyncSession]:
+    session_maker = await get_replica_router().session_maker(max_lag)
+
+    async with session_maker() as session:
         yield session
-        
+
+
+async def get_session(profile: EngineProfile = EngineProfile.oltp) -> AsyncIterator[AsyncSession]:
+    async with get_session_maker(profile)() as session:
+        yield session
+
 
 class Base(DeclarativeBase):
     pass
@@ -5,18 +5,28 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from app.db.database import Base, DATABASE_URL
+from app.core.config import settings
+from app.db.database import Base
 from app.db.models.accounts.models import Account
 from app.db.models.clients.models import Client
-from app.db.models.banks.models import Bank
+from app.db.models.banks.models import Bank, BankCommissionShard, BankFeeSchedule, BankStats, ReferenceDataVersion
 from app.db.models.branches.models import Branch
-from app.db.models.transactions.models import Transaction, OperationLog
+from app.db.models.transactions.models import (
+    AccrualRun,
+    IdempotencyKey,
+    LedgerEntry,
+    OperationLog,
+    ReconciledAccount,
+    ReconciledBank,
+    ReconciliationWatermark,
+    Transaction,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-config.set_main_option("sqlalchemy.url", f"{DATABASE_URL}?async_fallback=True")
+config.set_main_option("sqlalchemy.url", f"{settings.DTABASE_URL}?async_fallback=True")
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,57 @@
+"""query pattern indexes
+
+Revision ID: d41a7c3b9e55
+Revises: 8f2b6d4e1c90
+Create Date: 2026-10-18 11:00:05.137662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c3b9e55'
+down_revision: Union[str, None] = '8f2b6d4e1c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The ix_*_id indexes duplicate the primary key indexes.
+    op.drop_index(op.f('ix_bank_id'), table_name='bank')
+    op.drop_index(op.f('ix_client_id'), table_name='client')
+    op.drop_index(op.f('ix_account_id'), table_name='account')
+    op.drop_index(op.f('ix_branch_id'), table_name='branch')
+    op.drop_index(op.f('ix_transaction_id'), table_name='transaction')
+
+    # Build without blocking writes on large tables.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_account_client_id', 'account', ['client_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_account_bank_id', 'account', ['bank_id'], unique=False, postgresql_include=['balance'], postgresql_concurrently=True)
+        op.create_index('ix_account_bank_id_open', 'account', ['bank_id'], unique=False, postgresql_include=['balance'], postgresql_where=sa.text('closed_at IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_branch_bank_id', 'branch', ['bank_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_transaction_from_account_id_created_at', 'transaction', ['from_account_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_transaction_to_account_id_created_at', 'transaction', ['to_account_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_transaction_created_at', 'transaction', ['created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_operation_log_client_id_timestampe', 'operation_log', ['client_id', 'timestampe'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_operation_log_client_id_timestampe', table_name='operation_log')
+    op.drop_index('ix_transaction_created_at', table_name='transaction')
+    op.drop_index('ix_transaction_to_account_id_created_at', table_name='transaction')
+    op.drop_index('ix_transaction_from_account_id_created_at', table_name='transaction')
+    op.drop_index('ix_branch_bank_id', table_name='branch')
+    op.drop_index('ix_account_bank_id_open', table_name='account')
+    op.drop_index('ix_account_bank_id', table_name='account')
+    op.drop_index('ix_account_client_id', table_name='account')
+
+    op.create_index(op.f('ix_transaction_id'), 'transaction', ['id'], unique=False)
+    op.create_index(op.f('ix_branch_id'), 'branch', ['id'], unique=False)
+    op.create_index(op.f('ix_account_id'), 'account', ['id'], unique=False)
+    op.create_index(op.f('ix_client_id'), 'client', ['id'], unique=False)
+    op.create_index(op.f('ix_bank_id'), 'bank', ['id'], unique=False)
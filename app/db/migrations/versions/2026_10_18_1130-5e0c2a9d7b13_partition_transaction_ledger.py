@@ -0,0 +1,115 @@
+"""partition transaction ledger
+
+Revision ID: 5e0c2a9d7b13
+Revises: d41a7c3b9e55
+Create Date: 2026-10-18 11:30:21.550874
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0c2a9d7b13'
+down_revision: Union[str, None] = 'd41a7c3b9e55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONTHS_AHEAD = 3
+
+
+def _next_month(day: date) -> date:
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def _drop_ledger_indexes() -> None:
+    op.drop_index('ix_transaction_from_account_id_created_at', table_name='transaction')
+    op.drop_index('ix_transaction_to_account_id_created_at', table_name='transaction')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_ledger_indexes()
+    op.drop_index('ix_transaction_created_at', table_name='transaction')
+    op.rename_table('transaction', 'transaction_legacy')
+    op.execute('ALTER TABLE transaction_legacy RENAME CONSTRAINT transaction_pkey TO transaction_legacy_pkey')
+    op.execute('ALTER SEQUENCE transaction_id_seq OWNED BY NONE')
+    op.execute('ALTER SEQUENCE transaction_id_seq AS bigint')
+
+    op.create_table('transaction',
+    sa.Column('id', sa.BigInteger(), server_default=sa.text("nextval('transaction_id_seq')"), nullable=False),
+    sa.Column('from_account_id', sa.Integer(), nullable=True),
+    sa.Column('to_account_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('fee', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('type', postgresql.ENUM('deposit', 'withdraw', 'transfer', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['from_account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['to_account_id'], ['account.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.execute('ALTER SEQUENCE transaction_id_seq OWNED BY "transaction".id')
+
+    first = op.get_bind().execute(sa.text('SELECT min(created_at) FROM transaction_legacy')).scalar()
+    month = (first.date() if first else date.today()).replace(day=1)
+    last = date.today().replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+
+    while month <= last:
+        op.execute(
+            f'CREATE TABLE "transaction_y{month.year}m{month.month:02d}" PARTITION OF "transaction" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+    op.execute('CREATE TABLE transaction_default PARTITION OF "transaction" DEFAULT')
+
+    op.execute(
+        'INSERT INTO "transaction" (id, from_account_id, to_account_id, amount, fee, type, created_at) '
+        'SELECT id, from_account_id, to_account_id, amount, fee, type, created_at FROM transaction_legacy'
+    )
+    op.drop_table('transaction_legacy')
+
+    op.create_index('ix_transaction_from_account_id_created_at', 'transaction', ['from_account_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_transaction_to_account_id_created_at', 'transaction', ['to_account_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_transaction_created_at_brin', 'transaction', ['created_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transaction_created_at_brin', table_name='transaction')
+    _drop_ledger_indexes()
+    op.rename_table('transaction', 'transaction_partitioned')
+    op.execute('ALTER SEQUENCE transaction_id_seq OWNED BY NONE')
+
+    op.create_table('transaction',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('transaction_id_seq')"), nullable=False),
+    sa.Column('from_account_id', sa.Integer(), nullable=True),
+    sa.Column('to_account_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('fee', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('type', postgresql.ENUM('deposit', 'withdraw', 'transfer', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['from_account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['to_account_id'], ['account.id'], ),
+    sa.PrimaryKeyConstraint('id', name='transaction_pkey')
+    )
+    op.execute(
+        'INSERT INTO "transaction" (id, from_account_id, to_account_id, amount, fee, type, created_at) '
+        'SELECT id, from_account_id, to_account_id, amount, fee, type, created_at FROM transaction_partitioned'
+    )
+    op.execute('DROP TABLE transaction_partitioned CASCADE')
+    op.execute('ALTER SEQUENCE transaction_id_seq AS integer')
+    op.execute('ALTER SEQUENCE transaction_id_seq OWNED BY "transaction".id')
+
+    op.create_index('ix_transaction_from_account_id_created_at', 'transaction', ['from_account_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_transaction_to_account_id_created_at', 'transaction', ['to_account_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_transaction_created_at', 'transaction', ['created_at'], unique=False)
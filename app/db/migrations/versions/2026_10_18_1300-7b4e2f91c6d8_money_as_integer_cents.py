@@ -0,0 +1,56 @@
+"""money as integer cents
+
+Revision ID: 7b4e2f91c6d8
+Revises: c19f5b7a3e02
+Create Date: 2026-10-18 13:00:21.408573
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4e2f91c6d8'
+down_revision: Union[str, None] = 'c19f5b7a3e02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONEY_COLUMNS = [
+    # (table, column, numeric precision)
+    ('account', 'balance', 12),
+    ('bank', 'comission_income', 12),
+    ('bank_commission_shard', 'amount', 12),
+    ('bank_stats', 'total_balance', 18),
+    ('branch', 'balance', 12),
+    ('transaction', 'amount', 12),
+    ('transaction', 'fee', 12),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Values already have two decimal places, so * 100 is exact. Altering the
+    # partitioned "transaction" parent rewrites every partition.
+    for table, column, _ in MONEY_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.BigInteger(),
+            existing_nullable=False,
+            postgresql_using=f'round({column} * 100)::bigint',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column, precision in MONEY_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Numeric(precision=precision, scale=2),
+            existing_nullable=False,
+            postgresql_using=f'({column} / 100.0)::numeric({precision}, 2)',
+        )
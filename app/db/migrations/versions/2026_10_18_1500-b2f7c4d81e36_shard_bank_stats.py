@@ -0,0 +1,60 @@
+"""shard bank_stats
+
+Revision ID: b2f7c4d81e36
+Revises: a6d3e9c15b72
+Create Date: 2026-10-18 15:00:41.220583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f7c4d81e36'
+down_revision: Union[str, None] = 'a6d3e9c15b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows become shard 0.
+    op.add_column('bank_stats', sa.Column('shard', sa.Integer(), server_default='0', nullable=False))
+    op.alter_column('bank_stats', 'shard', server_default=None)
+    op.drop_constraint('bank_stats_pkey', 'bank_stats', type_='primary')
+    op.create_primary_key('bank_stats_pkey', 'bank_stats', ['bank_id', 'shard'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold the shards back into one row per bank.
+    op.execute(
+        """
+        INSERT INTO bank_stats (bank_id, shard, total_balance, account_count, branch_count)
+        SELECT DISTINCT bank_id, 0, 0, 0, 0 FROM bank_stats
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        UPDATE bank_stats
+        SET total_balance = shards.total_balance,
+            account_count = shards.account_count,
+            branch_count = shards.branch_count
+        FROM (
+            SELECT bank_id,
+                   sum(total_balance) AS total_balance,
+                   sum(account_count) AS account_count,
+                   sum(branch_count) AS branch_count
+            FROM bank_stats
+            GROUP BY bank_id
+        ) AS shards
+        WHERE bank_stats.bank_id = shards.bank_id AND bank_stats.shard = 0
+        """
+    )
+    op.execute("DELETE FROM bank_stats WHERE shard <> 0")
+    op.drop_constraint('bank_stats_pkey', 'bank_stats', type_='primary')
+    op.create_primary_key('bank_stats_pkey', 'bank_stats', ['bank_id'])
+    op.drop_column('bank_stats', 'shard')
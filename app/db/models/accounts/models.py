@@ -2,24 +2,35 @@ from datetime import datetime
 from decimal import Decimal
 from sqlalchemy import (
     DateTime, 
+    Index,
     Integer,
     ForeignKey,  
     func, 
-    DECIMAL as SQLAlchemyDecimal
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
+from app.db.types import MoneyType
 
 
 class Account(Base):
     __tablename__ = "account"
+    __table_args__ = (
+        Index("ix_account_client_id", "client_id"),
+        Index("ix_account_bank_id", "bank_id", postgresql_include=["balance"]),
+        Index(
+            "ix_account_bank_id_open",
+            "bank_id",
+            postgresql_include=["balance"],
+            postgresql_where=text("closed_at IS NULL"),
+        ),
+    )
     
     id: Mapped[int] = mapped_column(
         Integer,
         primary_key=True,
         nullable=False,
-        index=True,
     )
     bank_id: Mapped[int] = mapped_column(
         Integer,
@@ -31,6 +42,6 @@ class Account(Base):
         ForeignKey("client.id"),
         nullable=False,
     )
-    balance: Mapped[Decimal] = mapped_column(SQLAlchemyDecimal(12, 2), default=Decimal("0.00"), nullable=False)
+    balance: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     closed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -1,8 +1,9 @@
 from decimal import Decimal
-from sqlalchemy import Integer, Numeric, String, DECIMAL as SQLAlchemyDecimal
+from sqlalchemy import BigInteger, ForeignKey, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
+from app.db.types import MoneyType
 
 
 class Bank(Base):
@@ -11,11 +12,63 @@ class Bank(Base):
     id: Mapped[int] = mapped_column(
         primary_key=True, 
         nullable=False,
-        index=True,
     )
     name: Mapped[str] = mapped_column(
         String(100),
         nullable=False,
         unique=True,
     )
-    comission_income: Mapped[Decimal] = mapped_column(SQLAlchemyDecimal(12, 2), default=Decimal("0.00"), nullable=False)
+    comission_income: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
+
+
+class BankCommissionShard(Base):
+    __tablename__ = "bank_commission_shard"
+    
+    bank_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("bank.id"),
+        primary_key=True,
+    )
+    shard: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+    )
+    amount: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
+
+
+class BankStats(Base):
+    __tablename__ = "bank_stats"
+    
+    bank_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("bank.id"),
+        primary_key=True,
+    )
+    # Like bank_commission_shard: a bank's totals are the sum over its shards.
+    shard: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        default=0,
+    )
+    total_balance: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
+    account_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    branch_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class BankFeeSchedule(Base):
+    __tablename__ = "bank_fee_schedule"
+    
+    bank_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("bank.id"),
+        primary_key=True,
+    )
+    same_bank_rate: Mapped[Decimal] = mapped_column(Numeric(6, 4), default=Decimal("0.001"), nullable=False)
+    cross_bank_rate: Mapped[Decimal] = mapped_column(Numeric(6, 4), default=Decimal("0.01"), nullable=False)
+
+
+class ReferenceDataVersion(Base):
+    __tablename__ = "reference_data_version"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
@@ -1,18 +1,21 @@
 from decimal import Decimal
-from sqlalchemy import Integer, Numeric, ForeignKey, DECIMAL as SQLAlchemyDecimal
+from sqlalchemy import Index, Integer, Numeric, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
+from app.db.types import MoneyType
 
 
 class Branch(Base):
     __tablename__ = "branch"
+    __table_args__ = (
+        Index("ix_branch_bank_id", "bank_id"),
+    )
     
     id: Mapped[int] = mapped_column(
         Integer,
         primary_key=True,
         nullable=False,
-        index=True,
     )
     bank_id: Mapped[int] = mapped_column(
         Integer,
@@ -20,7 +23,7 @@ class Branch(Base):
         nullable=False,
     )
     balance: Mapped[Decimal] = mapped_column(
-        SQLAlchemyDecimal(12, 2),
+        MoneyType(),
         default=Decimal("0.00"),
         nullable=False,
     )
@@ -11,6 +11,5 @@ class Client(Base):
         Integer,
         primary_key=True,
         nullable=False,
-        index=True,
     )
     telegram_id: Mapped[int] = mapped_column(unique=True)
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import JSON, DateTime, Integer, ForeignKey, Numeric, Enum as SQLAlchemyEnum, func, DECIMAL as SQLAlchemyDecimal
+from sqlalchemy import JSON, BigInteger, Date, DateTime, Index, Integer, ForeignKey, Numeric, String, UniqueConstraint, Enum as SQLAlchemyEnum, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from decimal import Decimal
@@ -8,12 +8,15 @@ from decimal import Decimal
 from enum import Enum
 
 from app.db.database import Base
+from app.db.types import MoneyType
 
 
 class TransactionType(str, Enum):
     deposit = "deposit"
     withdraw = "withdRaw"
     transfer = "transfer"
+    interest = "interest"
+    maintenance_fee = "maintenance_fee"
 
 
 class OperationType(str, Enum):
@@ -26,12 +29,19 @@ class OperationType(str, Enum):
 
 class Transaction(Base):
     __tablename__ = "transaction"
+    __table_args__ = (
+        Index("ix_transaction_from_account_id_created_at", "from_account_id", "created_at", "id"),
+        Index("ix_transaction_to_account_id_created_at", "to_account_id", "created_at", "id"),
+        Index("ix_transaction_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
+    # The partition key has to be part of the primary key, hence (id, created_at).
     id: Mapped[int] = mapped_column(
-        Integer,
+        BigInteger,
         primary_key=True,
+        autoincrement=True,
         nullable=False,
-        index=True,
     )
     from_account_id: Mapped[int | None] = mapped_column(
         Integer,
@@ -43,14 +53,118 @@ class Transaction(Base):
         ForeignKey("account.id"),
         nullable=True,
     )
-    amount: Mapped[Decimal] = mapped_column(SQLAlchemyDecimal(12, 2), nullable=False)
-    fee: Mapped[Decimal] = mapped_column(SQLAlchemyDecimal(12, 2), default=Decimal("0.00"), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(MoneyType(), nullable=False)
+    fee: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
     type: Mapped[Enum] = mapped_column(SQLAlchemyEnum(TransactionType), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default = func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default = func.now(), primary_key=True, nullable=False)
+
+
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entry"
+    __table_args__ = (
+        Index(
+            "ix_ledger_entry_account_id_created_at",
+            "account_id",
+            "created_at",
+            "id",
+            postgresql_include=["balance_after"],
+        ),
+    )
+    
+    id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True,
+        nullable=False,
+    )
+    # No foreign key: transaction's primary key is (id, created_at). NULL for
+    # opening balances of accounts that predate the ledger.
+    transaction_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    account_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("account.id"),
+        nullable=False,
+    )
+    # Signed: credits are positive, debits (including the fee) negative.
+    amount: Mapped[Decimal] = mapped_column(MoneyType(), nullable=False)
+    balance_after: Mapped[Decimal] = mapped_column(MoneyType(), nullable=False)
+    # clock_timestamp() rather than now(): entries are written while the
+    # account row is locked, so their order matches the order of postings.
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.clock_timestamp(), nullable=False)
+
+
+class AccrualKind(str, Enum):
+    interest = "interest"
+    maintenance_fee = "maintenance_fee"
+
+
+class AccrualRun(Base):
+    """Checkpoint of one accrual over one bank for one period.
+
+    last_account_id is advanced in the same transaction as each chunk of
+    postings, so a rerun resumes after the last committed chunk.
+    """
+    __tablename__ = "accrual_run"
+    __table_args__ = (
+        UniqueConstraint("bank_id", "kind", "period_start"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    bank_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("bank.id"),
+        nullable=False,
+    )
+    kind: Mapped[Enum] = mapped_column(SQLAlchemyEnum(AccrualKind), nullable=False)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    # Interest rate for the period, or the flat maintenance fee.
+    rate: Mapped[Decimal | None] = mapped_column(Numeric(10, 6), nullable=True)
+    fee: Mapped[Decimal | None] = mapped_column(MoneyType(), nullable=True)
+    last_account_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    accounts_posted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class ReconciliationWatermark(Base):
+    """How far reconciliation has folded the transaction history.
+
+    Moved forward in the same transaction as the reconciled_account and
+    reconciled_bank totals it covers, one chunk at a time.
+    """
+    __tablename__ = "reconciliation_watermark"
+    
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # (created_at, id) of the last folded transaction.
+    last_created_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_transaction_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    transactions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class ReconciledAccount(Base):
+    __tablename__ = "reconciled_account"
+    
+    # No foreign key, so reconciliation never holds up closing an account.
+    account_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # Balance implied by the transactions up to the watermark.
+    balance: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
+
+
+class ReconciledBank(Base):
+    __tablename__ = "reconciled_bank"
+    
+    bank_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # Comission implied by transfer fees and maintenance fees up to the watermark.
+    comission: Mapped[Decimal] = mapped_column(MoneyType(), default=Decimal("0.00"), nullable=False)
 
 
 class OperationLog(Base):
     __tablename__ = "operation_log"
+    __table_args__ = (
+        Index("ix_operation_log_client_id_timestampe", "client_id", "timestampe"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     client_id: Mapped[int] = mapped_column(
@@ -61,3 +175,13 @@ class OperationLog(Base):
     action: Mapped[Enum] = mapped_column(SQLAlchemyEnum(OperationType), nullable=False)
     timestampe: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     data: Mapped[dict] = mapped_column(JSON)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_key"
+    
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    operation: Mapped[Enum] = mapped_column(SQLAlchemyEnum(OperationType), nullable=False)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -0,0 +1,50 @@
+import operator
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from sqlalchemy import BigInteger, Numeric
+from sqlalchemy.types import TypeDecorator
+
+from app.core.money import Money, from_cents, to_cents
+
+
+class MoneyType(TypeDecorator):
+    """Money stored as BIGINT cents.
+
+    Binds Money values as their cents and Decimal / int / str amounts by
+    rounding them half to even to a cent; loads as two-place Decimal so
+    callers keep working with Decimal. Batch code that wants raw cents can
+    select `type_coerce(column, BigInteger)` and bind Money back.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    class Comparator(TypeDecorator.Comparator):
+        def _adapt_expression(self, op, other_comparator):
+            # balance + amount is still money, not a bare BIGINT.
+            if op in (operator.add, operator.sub):
+                return op, self.type
+            return super()._adapt_expression(op, other_comparator)
+
+    comparator_factory = Comparator
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, Money):
+            return value.cents
+        return to_cents(Decimal(value))
+
+    def process_result_value(self, value, dialect) -> Decimal | None:
+        if value is None:
+            return None
+        if not isinstance(value, int):
+            # sum() over BIGINT and balance * rate come back as NUMERIC.
+            value = Decimal(value).to_integral_value(rounding=ROUND_HALF_EVEN)
+        return from_cents(value)
+
+    def coerce_compared_value(self, op, value):
+        # Rates and factors are plain numbers; everything else is an amount.
+        if op in (operator.mul, operator.truediv):
+            return Numeric()
+        return self
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import logging
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.db.database import EngineProfile, get_session_maker
+from app.db.models.banks.models import Bank
+from app.db.models.transactions.models import AccrualKind
+from app.services.accrual import run_accrual
+
+
+logger = logging.getLogger(__name__)
+
+
+async def accrue(
+    kind: AccrualKind,
+    period_start: date,
+    bank_ids: list[int] | None = None,
+    rate: Decimal | None = None,
+    fee: Decimal | None = None,
+    chunk_size: int | None = None,
+):
+    async with get_session_maker(EngineProfile.batch)() as session:
+        if not bank_ids:
+            bank_ids = list(await session.scalars(select(Bank.id).order_by(Bank.id)))
+            await session.commit()
+        
+        for bank_id in bank_ids:
+            run = await run_accrual(
+                session,
+                bank_id,
+                kind,
+                period_start,
+                rate=rate,
+                fee=fee,
+                chunk_size=chunk_size,
+            )
+            logger.info(
+                "Accrued %s for bank %d, period %s: %d accounts, total %s",
+                kind.value, bank_id, period_start, run.accounts_posted, run.total,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Post interest or maintenance fees to every open account. "
+                    "Rerunning the same period resumes an interrupted run and never posts twice."
+    )
+    parser.add_argument("kind", choices=[kind.value for kind in AccrualKind])
+    parser.add_argument("--rate", type=Decimal, help="interest rate for the period, e.g. 0.0025")
+    parser.add_argument("--fee", type=Decimal, help="maintenance fee per account, e.g. 1.50")
+    parser.add_argument("--period", default=date.today().replace(day=1).isoformat(), help="ISO date of the period start")
+    parser.add_argument("--bank-id", type=int, action="append", dest="bank_ids", help="repeatable; all banks by default")
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    asyncio.run(accrue(
+        AccrualKind(args.kind),
+        date.fromisoformat(args.period),
+        bank_ids=args.bank_ids,
+        rate=args.rate,
+        fee=args.fee,
+        chunk_size=args.chunk_size,
+    ))
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+import logging
+
+from app.db.database import EngineProfile, get_session_maker
+from app.services.bank_service import BankService
+
+
+logger = logging.getLogger(__name__)
+
+
+async def compact_comission_once() -> dict:
+    async with get_session_maker(EngineProfile.batch)() as session:
+        totals = await BankService(session).compact_comission()
+        stats_banks = await BankService(session).compact_stats()
+    
+    if totals:
+        logger.info("Compacted comission shards for %d banks", len(totals))
+    if stats_banks:
+        logger.info("Compacted bank_stats shards for %d banks", len(stats_banks))
+    
+    return totals
+
+
+async def compact_comission_periodically(interval: float = 60.0):
+    while True:
+        try:
+            await compact_comission_once()
+        except Exception:
+            logger.exception("Comission compaction failed")
+        
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold bank comission shards into bank.comission_income and bank_stats shards into shard 0")
+    parser.add_argument("--interval", type=float, default=60.0)
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    if args.once:
+        asyncio.run(compact_comission_once())
+    else:
+        asyncio.run(compact_comission_periodically(args.interval))
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import logging
+
+from app.db.database import EngineProfile, get_session_maker
+from app.services.idempotency import purge_expired_keys
+
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_once() -> int:
+    async with get_session_maker(EngineProfile.batch)() as session:
+        purged = await purge_expired_keys(session)
+    
+    if purged:
+        logger.info("Purged %d expired idempotency keys", purged)
+    
+    return purged
+
+
+async def purge_periodically(interval: float = 600.0):
+    while True:
+        try:
+            await purge_once()
+        except Exception:
+            logger.exception("Idempotency key purge failed")
+        
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete expired idempotency keys")
+    parser.add_argument("--interval", type=float, default=600.0)
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    if args.once:
+        asyncio.run(purge_once())
+    else:
+        asyncio.run(purge_periodically(args.interval))
@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import EngineProfile, get_session_maker
+
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "transaction"
+DEFAULT_PARTITION = "transaction_default"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def partition_name(start: date) -> str:
+    return f"transaction_y{start.year}m{start.month:02d}"
+
+
+async def list_partitions(session: AsyncSession) -> list[str]:
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :parent "
+            "ORDER BY child.relname"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return list(result.scalars())
+
+
+async def create_partition(session: AsyncSession, month: date, has_default: bool = True) -> str:
+    name = partition_name(month)
+    in_month = f"created_at >= '{month.isoformat()}' AND created_at < '{next_month(month).isoformat()}'"
+    create = text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT_TABLE}" '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    )
+
+    spilled = has_default and await session.scalar(
+        text(f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE {in_month})')
+    )
+    if not spilled:
+        await session.execute(create)
+        return name
+
+    # Postgres refuses a partition whose rows already sit in the default one
+    # (e.g. after a missed run), so move them over with the default detached.
+    logger.warning("Moving rows for %s out of %s", name, DEFAULT_PARTITION)
+    await session.execute(text(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}"'))
+    await session.execute(create)
+    await session.execute(text(f'INSERT INTO "{name}" SELECT * FROM "{DEFAULT_PARTITION}" WHERE {in_month}'))
+    await session.execute(text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_month}'))
+    await session.execute(text(f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT'))
+
+    return name
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    months_ahead: int = 3,
+    start: date | None = None,
+) -> list[str]:
+    existing = set(await list_partitions(session))
+    created = []
+
+    month = month_start(start or date.today())
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            # One savepoint per month, so a failure does not stop later months.
+            savepoint = await session.begin_nested()
+            try:
+                await create_partition(session, month, has_default=DEFAULT_PARTITION in existing)
+            except Exception:
+                await savepoint.rollback()
+                logger.exception("Failed to create ledger partition %s", name)
+            else:
+                await savepoint.commit()
+                created.append(name)
+        month = next_month(month)
+
+    await session.commit()
+
+    for name in created:
+        logger.info("Created ledger partition %s", name)
+
+    return created
+
+
+async def detach_partitions(
+    session: AsyncSession,
+    before: date,
+    archive_schema: str = "archive",
+    drop: bool = False,
+) -> list[str]:
+    cutoff = partition_name(month_start(before))
+    detached = []
+
+    await session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+
+    for name in await list_partitions(session):
+        # Names sort chronologically, so everything below the cutoff is older.
+        if name == DEFAULT_PARTITION or name >= cutoff:
+            continue
+
+        await session.execute(text(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"'))
+        if drop:
+            await session.execute(text(f'DROP TABLE "{name}"'))
+        else:
+            await session.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+        detached.append(name)
+
+    await session.commit()
+
+    for name in detached:
+        logger.info("%s ledger partition %s", "Dropped" if drop else "Archived", name)
+
+    return detached
+
+
+async def ensure_partitions_periodically(months_ahead: int = 3, interval: float = 3600.0):
+    while True:
+        try:
+            async with get_session_maker(EngineProfile.batch)() as session:
+                await ensure_partitions(session, months_ahead=months_ahead)
+        except Exception:
+            logger.exception("Ledger partition maintenance failed")
+
+        await asyncio.sleep(interval)
+
+
+async def main(args: argparse.Namespace):
+    if args.command == "ensure" and args.interval:
+        await ensure_partitions_periodically(args.months_ahead, args.interval)
+        return
+
+    async with get_session_maker(EngineProfile.batch)() as session:
+        if args.command == "ensure":
+            await ensure_partitions(session, months_ahead=args.months_ahead)
+        elif args.command == "detach":
+            await detach_partitions(
+                session,
+                before=date.fromisoformat(args.before),
+                archive_schema=args.archive_schema,
+                drop=args.drop,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of the transaction ledger")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure = commands.add_parser("ensure", help="create partitions for the current and upcoming months")
+    ensure.add_argument("--months-ahead", type=int, default=3)
+    ensure.add_argument("--interval", type=float, default=0, help="keep running, checking every N seconds")
+
+    detach = commands.add_parser("detach", help="detach partitions older than a date")
+    detach.add_argument("--before", required=True, help="ISO date, e.g. 2025-01-01")
+    detach.add_argument("--archive-schema", default="archive")
+    detach.add_argument("--drop", action="store_true", help="drop detached partitions instead of archiving")
+
+    logging.basicConfig(level=logging.INFO)
+
+    asyncio.run(main(parser.parse_args()))
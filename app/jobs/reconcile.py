@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.db.database import EngineProfile, get_session_maker
+from app.services.reconciliation import ReconciliationReport, reconcile
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_once(
+    chunk_size: int | None = None,
+    lag_seconds: float | None = None,
+    limit: int | None = None,
+) -> ReconciliationReport:
+    session_maker = get_session_maker(EngineProfile.batch)
+    
+    # One session streams the history, the other commits checkpoints.
+    async with session_maker() as read_session, session_maker() as write_session:
+        report = await reconcile(
+            read_session,
+            write_session,
+            chunk_size=chunk_size,
+            lag_seconds=lag_seconds,
+            limit=limit,
+        )
+    
+    logger.info("Folded %d transactions", report.transactions_folded)
+    for drift in report.accounts:
+        logger.warning(
+            "Account %d (bank %d): balance %s, transactions say %s",
+            drift.account_id, drift.bank_id, drift.balance, drift.expected,
+        )
+    for drift in report.banks:
+        logger.warning(
+            "Bank %d: comission %s, transactions say %s",
+            drift.bank_id, drift.comission, drift.expected,
+        )
+    
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check account balances and bank comission against the transaction history. "
+                    "Only transactions past the stored watermark are read; exits with 1 on drift."
+    )
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--lag-seconds", type=float, help="leave transactions younger than this for the next run")
+    parser.add_argument("--limit", type=int, default=1_000, help="max drifted accounts to report")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    report = asyncio.run(reconcile_once(
+        chunk_size=args.chunk_size,
+        lag_seconds=args.lag_seconds,
+        limit=args.limit,
+    ))
+    sys.exit(0 if report.ok else 1)
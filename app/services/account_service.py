@@ -2,15 +2,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy import select, update
 
+from datetime import datetime
 from decimal import Decimal
 
+from app.core.metrics import instrument_service
+from app.core.money import quantize_money
 from app.db.models.clients.models import Client
 from app.db.models.accounts.models import Account
+from app.db.models.transactions.models import Transaction, TransactionType
+from app.services.balances import credit_account, debit_account
+from app.services.ledger import balance_at, record_transaction
+from app.services.stats import bump_bank_stats
 
 
+@instrument_service
 class AccountService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: AsyncSession | None = None):
         self.session = session
+        self.read_session = read_session or session
         
     async def create_account(self, bank_id: int, client_id: int) -> Account:
         account = Account(
@@ -20,42 +29,64 @@ class AccountService:
         )
         self.session.add(account)
         
+        await bump_bank_stats(self.session, bank_id, accounts=1)
+        
         await self.session.commit()
         await self.session.refresh(account)
         
         return account
     
     async def deposit(self, account_id: int, amount: Decimal):
-        result = await self.session.execute(
-            select(Account).
-            where(Account.id == account_id)
+        amount = quantize_money(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
+        
+        account = await credit_account(self.session, account_id, amount)
+        
+        transaction = Transaction(
+            from_account_id=None,
+            to_account_id=account_id,
+            amount=amount,
+            fee=Decimal("0.00"),
+            type=TransactionType.deposit,
         )
-        account = result.scalar_one_or_none()
-        account.balance += amount
+        await record_transaction(self.session, transaction, [
+            (account_id, amount, account.balance),
+        ])
         
         await self.session.commit()
         
         return account
     
     async def withdraw(self, account_id: int, amount: Decimal):
-        result = await self.session.execute(
-            select(Account).
-            where(Account.id == account_id)
-        )
-        account = result.scalar_one_or_none()
+        amount = quantize_money(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
         
-        if account.balance < amount:
-            raise ValueError("Not enough funds")
-        account.balance -= amount
+        account = await debit_account(self.session, account_id, amount)
+        
+        transaction = Transaction(
+            from_account_id=account_id,
+            to_account_id=None,
+            amount=amount,
+            fee=Decimal("0.00"),
+            type=TransactionType.withdraw,
+        )
+        await record_transaction(self.session, transaction, [
+            (account_id, -amount, account.balance),
+        ])
         
         await self.session.commit()
         
         return account
 
     async def get_accounts(self, client_id: int) -> list[Account]:
-        stmt = await self.session.execute(
+        stmt = await self.read_session.execute(
             select(Account)
             .where(Account.client_id == client_id)
         )
         
         return stmt.scalars().all()
+    
+    async def get_balance_at(self, account_id: int, at: datetime) -> Decimal:
+        return await balance_at(self.read_session, account_id, at)
@@ -0,0 +1,214 @@
+from datetime import date, datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import BigInteger, Numeric, bindparam, case, cast, func, literal, select, type_coerce, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.money import Money, to_cents
+from app.db.bulk import BulkWriter, reserve_ids
+from app.db.models.accounts.models import Account
+from app.db.models.transactions.models import AccrualKind, AccrualRun, LedgerEntry, Transaction, TransactionType
+from app.services.bank_service import BankService
+from app.services.stats import bump_bank_balances
+
+
+# AccrualRun.rate is Numeric(10, 6); rates are rounded to it before they are
+# stored or compared with a stored run.
+RATE_QUANTUM = Decimal("0.000001")
+
+
+def _round_half_even(value):
+    # Postgres round() goes half away from zero; Money rounds half to even.
+    floor = func.floor(value)
+    return case(
+        (value - floor == Decimal("0.5"), floor + func.mod(floor, 2)),
+        else_=func.round(value),
+    )
+
+
+def _posting_amount(run: AccrualRun, balance):
+    """Signed cents to post to an account holding `balance` cents."""
+    if run.kind == AccrualKind.interest:
+        amount = _round_half_even(balance * bindparam("rate", run.rate, type_=Numeric))
+    else:
+        # A maintenance fee never takes an account below zero.
+        amount = -func.least(literal(to_cents(run.fee), BigInteger), balance)
+
+    return cast(case((balance > 0, amount), else_=0), BigInteger)
+
+
+async def start_run(
+    session: AsyncSession,
+    bank_id: int,
+    kind: AccrualKind,
+    period_start: date,
+    rate: Decimal | None = None,
+    fee: Decimal | None = None,
+) -> AccrualRun:
+    if rate is not None:
+        rate = Decimal(rate).quantize(RATE_QUANTUM, rounding=ROUND_HALF_EVEN)
+    if kind == AccrualKind.interest and (rate is None or rate <= 0):
+        raise ValueError("Interest accrual needs a positive rate")
+    if kind == AccrualKind.maintenance_fee and (fee is None or fee <= 0):
+        raise ValueError("Maintenance fee accrual needs a positive fee")
+
+    await session.execute(
+        insert(AccrualRun)
+        .values(
+            bank_id=bank_id,
+            kind=kind,
+            period_start=period_start,
+            rate=rate if kind == AccrualKind.interest else None,
+            fee=fee if kind == AccrualKind.maintenance_fee else None,
+            last_account_id=0,
+            accounts_posted=0,
+            total=Money(0),
+            started_at=func.now(),
+        )
+        .on_conflict_do_nothing(index_elements=["bank_id", "kind", "period_start"])
+    )
+    run = await session.scalar(
+        select(AccrualRun)
+        .where(
+            AccrualRun.bank_id == bank_id,
+            AccrualRun.kind == kind,
+            AccrualRun.period_start == period_start,
+        )
+    )
+    await session.commit()
+
+    # Resuming with other parameters would post the period twice over.
+    if (kind == AccrualKind.interest and run.rate != rate) or (
+        kind == AccrualKind.maintenance_fee and run.fee != Money.of(fee).to_decimal()
+    ):
+        raise ValueError(f"Accrual run {run.id} for this period was started with different parameters")
+
+    return run
+
+
+async def accrue_chunk(session: AsyncSession, run_id: int, chunk_size: int | None = None) -> int:
+    """Post the next chunk of a run in its own transaction.
+
+    Returns the number of accounts scanned; 0 once the run is finished.
+    """
+    chunk_size = chunk_size or settings.ACCRUAL_CHUNK_SIZE
+
+    # Locking the checkpoint serialises concurrent runners of the same run
+    # and guarantees last_account_id is the committed one.
+    run = await session.scalar(
+        select(AccrualRun)
+        .where(AccrualRun.id == run_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if run is None:
+        raise ValueError(f"Accrual run with id={run_id} not found")
+    if run.finished_at is not None:
+        await session.rollback()
+        return 0
+
+    in_run = (
+        Account.bank_id == run.bank_id,
+        Account.closed_at.is_(None),
+        Account.id > run.last_account_id,
+    )
+
+    # Lock the chunk in id order, the same order transfers lock accounts in.
+    chunk = (
+        select(Account.id)
+        .where(*in_run)
+        .order_by(Account.id)
+        .limit(chunk_size)
+        .with_for_update()
+        .subquery()
+    )
+    stmt = await session.execute(select(func.max(chunk.c.id), func.count()).select_from(chunk))
+    last_account_id, scanned = stmt.one()
+
+    if not scanned:
+        run.finished_at = datetime.now()
+        await session.commit()
+        return 0
+
+    balance = type_coerce(Account.balance, BigInteger)
+    postings = (
+        select(Account.id.label("account_id"), _posting_amount(run, balance).label("amount"))
+        .where(*in_run, Account.id <= last_account_id)
+        .subquery()
+    )
+    result = await session.execute(
+        update(Account)
+        .where(Account.id == postings.c.account_id, postings.c.amount != 0)
+        .values(balance=balance + postings.c.amount)
+        .returning(Account.id, postings.c.amount, balance)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+
+    transaction_type = TransactionType[run.kind.name]
+    transaction_ids = await reserve_ids(session, Transaction, len(rows))
+    transactions = []
+    entries = []
+    total = 0
+
+    for (account_id, amount, balance_after), transaction_id in zip(rows, transaction_ids):
+        total += amount
+        transactions.append({
+            "id": transaction_id,
+            "from_account_id": account_id if amount < 0 else None,
+            "to_account_id": account_id if amount > 0 else None,
+            "amount": Money(abs(amount)),
+            "fee": Money(0),
+            "type": transaction_type,
+        })
+        entries.append({
+            "transaction_id": transaction_id,
+            "account_id": account_id,
+            "amount": Money(amount),
+            "balance_after": Money(balance_after),
+        })
+
+    async with BulkWriter(session, Transaction) as writer:
+        await writer.add_many(transactions)
+    async with BulkWriter(session, LedgerEntry) as writer:
+        await writer.add_many(entries)
+
+    await bump_bank_balances(session, {run.bank_id: Money(total)})
+    if run.kind == AccrualKind.maintenance_fee and total:
+        # Fees are the bank's income, like transfer comission.
+        await BankService(session).add_comission_to_bank(run.bank_id, Money(-total), commit=False)
+
+    await session.execute(
+        update(AccrualRun)
+        .where(AccrualRun.id == run.id)
+        .values(
+            last_account_id=last_account_id,
+            accounts_posted=AccrualRun.accounts_posted + len(rows),
+            total=AccrualRun.total + Money(total),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    return scanned
+
+
+async def run_accrual(
+    session: AsyncSession,
+    bank_id: int,
+    kind: AccrualKind,
+    period_start: date,
+    rate: Decimal | None = None,
+    fee: Decimal | None = None,
+    chunk_size: int | None = None,
+) -> AccrualRun:
+    run = await start_run(session, bank_id, kind, period_start, rate=rate, fee=fee)
+
+    while await accrue_chunk(session, run.id, chunk_size):
+        pass
+
+    await session.refresh(run)
+
+    return run
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.bulk import BulkWriter
+from app.db.models.transactions.models import OperationLog, OperationType
+
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Collects OperationLog rows in memory and writes them in batches from a
+    background task, off the money-moving transaction.
+
+    enqueue() blocks once max_queue rows are waiting, which throttles callers
+    instead of growing memory without bound. A batch that fails to write is
+    kept and retried with exponential backoff; stop() drains everything left,
+    giving each remaining batch up to shutdown_attempts tries.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_queue: int = 10_000,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 30.0,
+        shutdown_attempts: int = 3,
+    ):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.shutdown_attempts = shutdown_attempts
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self.written = 0
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._stopping = True
+        await self._task
+        self._task = None
+
+    async def enqueue(self, client_id: int, action: OperationType, data: dict):
+        if self._stopping:
+            raise RuntimeError("Audit writer is shutting down")
+
+        await self.queue.put({
+            "client_id": client_id,
+            "action": action,
+            "data": data,
+        })
+
+    async def enqueue_committed(self, logs: list[tuple[int, OperationType, dict]]):
+        # The operation is already committed, so a writer that is shutting
+        # down must not turn it into an error for the caller.
+        for index, (client_id, action, data) in enumerate(logs):
+            try:
+                await self.enqueue(client_id, action, data)
+            except RuntimeError:
+                logger.error("Audit writer stopped, %d audit rows not written: %r", len(logs) - index, logs[index:])
+                return
+
+    async def _collect(self) -> list[dict]:
+        batch = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            if self._stopping:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def _write(self, batch: list[dict]):
+        async with self.session_maker() as session:
+            async with BulkWriter(session, OperationLog, buffer_size=len(batch)) as writer:
+                await writer.add_many(batch)
+            await session.commit()
+
+        self.written += len(batch)
+
+    async def _write_with_retry(self, batch: list[dict]):
+        delay = self.retry_delay
+        attempts = 0
+
+        while True:
+            try:
+                await self._write(batch)
+                return
+            except Exception:
+                attempts += 1
+                if self._stopping and attempts >= self.shutdown_attempts:
+                    logger.exception("Dropping %d audit rows after %d attempts: %r", len(batch), attempts, batch)
+                    return
+                logger.exception("Failed to write %d audit rows, retrying in %.1fs", len(batch), delay)
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+
+            if batch:
+                await self._write_with_retry(batch)
+            elif self._stopping:
+                return
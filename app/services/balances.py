@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+
+from app.db.models.accounts.models import Account
+from app.services.stats import bump_bank_stats
+
+
+async def credit_account(session: AsyncSession, account_id: int, amount: Decimal) -> Account:
+    stmt = await session.scalars(
+        update(Account)
+        .where(Account.id == account_id)
+        .values(balance=Account.balance + amount)
+        .returning(Account)
+    )
+    account = stmt.one_or_none()
+
+    if account is None:
+        raise ValueError(f"Account with id={account_id} not found")
+
+    await bump_bank_stats(session, account.bank_id, balance=amount)
+
+    return account
+
+
+async def debit_account(
+    session: AsyncSession,
+    account_id: int,
+    amount: Decimal,
+    error: str = "Not enough funds",
+) -> Account:
+    stmt = await session.scalars(
+        update(Account)
+        .where(Account.id == account_id, Account.balance >= amount)
+        .values(balance=Account.balance - amount)
+        .returning(Account)
+    )
+    account = stmt.one_or_none()
+
+    if account is None:
+        exists = await session.scalar(
+            select(Account.id)
+            .where(Account.id == account_id)
+        )
+        if exists is None:
+            raise ValueError(f"Account with id={account_id} not found")
+        raise ValueError(error)
+
+    await bump_bank_stats(session, account.bank_id, balance=-amount)
+
+    return account
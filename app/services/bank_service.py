@@ -1,16 +1,81 @@
+import random
+from collections import defaultdict
 from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import case, delete, literal, select, func, update
+from sqlalchemy.dialects.postgresql import insert
 
-from app.db.models.banks.models import Bank
+from app.core.config import settings
+from app.core.metrics import instrument_service
+from app.core.money import quantize_money
+from app.db.models.banks.models import Bank, BankCommissionShard, BankFeeSchedule, BankStats
 from app.db.models.branches.models import Branch
 from app.db.models.accounts.models import Account
+from app.db.types import MoneyType
+from app.services.reference_data import bump_reference_version, reference_data
+from app.services.stats import bump_bank_stats
 
 
+def _shards_total(bank_id: int):
+    return (
+        select(func.coalesce(func.sum(BankCommissionShard.amount), 0))
+        .where(BankCommissionShard.bank_id == bank_id)
+        .scalar_subquery()
+    )
+
+
+def summary_query(bank_id: int, use_stats: bool = True):
+    if use_stats:
+        stats = (
+            select(
+                BankStats.bank_id,
+                func.sum(BankStats.total_balance).label("total_balance"),
+                func.sum(BankStats.account_count).label("account_count"),
+                func.sum(BankStats.branch_count).label("branch_count"),
+            )
+            .where(BankStats.bank_id == bank_id)
+            .group_by(BankStats.bank_id)
+            .subquery("stats")
+        )
+        stmt = (
+            select(
+                Bank.name,
+                func.coalesce(stats.c.total_balance, 0),
+                Bank.comission_income + _shards_total(bank_id),
+                func.coalesce(stats.c.account_count, 0),
+                func.coalesce(stats.c.branch_count, 0),
+            )
+            .outerjoin(stats, stats.c.bank_id == Bank.id)
+            .where(Bank.id == bank_id)
+        )
+    else:
+        stmt = (
+            select(
+                Bank.name,
+                select(func.sum(Account.balance))
+                .where(Account.bank_id == bank_id)
+                .scalar_subquery(),
+                Bank.comission_income + _shards_total(bank_id),
+                select(func.count(Account.id))
+                .where(Account.bank_id == bank_id)
+                .scalar_subquery(),
+                select(func.count(Branch.id))
+                .where(Branch.bank_id == bank_id)
+                .scalar_subquery(),
+            )
+            .where(Bank.id == bank_id)
+        )
+    
+    return stmt
+
+
+@instrument_service
 class BankService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: AsyncSession | None = None):
         self.session = session
+        # Read-only reporting queries may be served by a replica session.
+        self.read_session = read_session or session
         
     async def create_bank(self, name: str) -> Bank:
         bank = Bank(
@@ -18,10 +83,16 @@ class BankService:
         )
         
         self.session.add(bank)
+        await self.session.flush()
+        
+        await bump_bank_stats(self.session, bank.id)
+        await bump_reference_version(self.session)
         
         await self.session.commit()
         await self.session.refresh(bank)
         
+        reference_data.invalidate()
+        
         return bank
 
     async def get_bank(self, bank_id: int) -> Bank:
@@ -33,6 +104,40 @@ class BankService:
         return stmt.scalar_one_or_none()
 
         
+    async def set_fee_schedule(
+        self,
+        bank_id: int,
+        same_bank_rate: Decimal,
+        cross_bank_rate: Decimal,
+    ) -> BankFeeSchedule:
+        if same_bank_rate < 0 or cross_bank_rate < 0:
+            raise ValueError("Fee rates must not be negative")
+        
+        stmt = await self.session.scalars(
+            insert(BankFeeSchedule)
+            .values(
+                bank_id=bank_id,
+                same_bank_rate=same_bank_rate,
+                cross_bank_rate=cross_bank_rate,
+            )
+            .on_conflict_do_update(
+                index_elements=[BankFeeSchedule.bank_id],
+                set_={
+                    "same_bank_rate": same_bank_rate,
+                    "cross_bank_rate": cross_bank_rate,
+                },
+            )
+            .returning(BankFeeSchedule)
+        )
+        schedule = stmt.one()
+        
+        await bump_reference_version(self.session)
+        await self.session.commit()
+        
+        reference_data.invalidate()
+        
+        return schedule
+    
     async def create_branch(self, bank_id: int) -> Branch:
         branch = Branch(
             bank_id=bank_id,
@@ -41,13 +146,15 @@ class BankService:
         
         self.session.add(branch)
         
+        await bump_bank_stats(self.session, bank_id, branches=1)
+        
         await self.session.commit()
         await self.session.refresh(branch)
         
         return branch
     
     async def get_branches(self, bank_id: int) -> list[Branch]:
-        stmt = await self.session.execute(
+        stmt = await self.read_session.execute(
             select(Branch)
             .where(Branch.bank_id == bank_id)
         )
@@ -57,74 +164,218 @@ class BankService:
         return branches
 
     async def deposit_to_branch(self, branch_id, amount: Decimal) -> Branch:
-        stmt = await self.session.execute(
-            select(Branch)
+        amount = quantize_money(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
+        
+        stmt = await self.session.scalars(
+            update(Branch)
             .where(Branch.id == branch_id)
+            .values(balance=Branch.balance + amount)
+            .returning(Branch)
         )
         
-        branch = stmt.scalar_one_or_none()
+        branch = stmt.one_or_none()
         if branch is None:
             raise ValueError(f"Branch with id={branch_id} not found")
         
-        if amount <= 0:
-            raise ValueError("Amount must be greater than zero")
-        
-        branch.balance += amount
-        
         await self.session.commit()
         
         return branch
     
     async def get_total_comission(self, bank_id: int) -> Decimal:
         stmt = await self.session.execute(
-            select(Bank.comission_income)
+            select(Bank.comission_income + _shards_total(bank_id))
             .where(Bank.id == bank_id)
         )
         return stmt.scalar_one_or_none() or Decimal("0.00")
     
     async def get_total_client_balance(self, bank_id: int) -> Decimal:
-        stmt = await self.session.execute(
+        stmt = await self.read_session.execute(
             select(func.sum(Account.balance))
             .where(Account.bank_id == bank_id)
         )
         
         return stmt.scalar_one_or_none()
     
-    async def get_summary(self, bank_id: int) -> dict:
-        bank = await self.get_bank(bank_id=bank_id)
-        if not bank:
-            raise ValueError(f"Bank with id={bank_id} not found")
-        
-        total_balance = await self.get_total_client_balance(bank_id=bank_id)
-        comission = await self.get_total_comission(bank_id=bank_id)
-        
-        result = await self.session.execute(
-            select(func.count(Account.id))
-            .where(Account.bank_id == bank_id)
-        )
+    async def get_summary(self, bank_id: int, use_stats: bool = True) -> dict:
+        stmt = summary_query(bank_id, use_stats)
         
-        account_count = result.scalar_one()
-        
-        result = await self.session.execute(
-            select(func.count(Branch.id))
-            .where(Branch.bank_id == bank_id)
-        )
+        result = await self.read_session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            raise ValueError(f"Bank with id={bank_id} not found")
         
-        branch_count = result.scalar_one()
+        bank_name, total_balance, comission, account_count, branch_count = row
         
         return {
-            "bank_name": bank.name,
+            "bank_name": bank_name,
             "client_total_balance": total_balance,
             "comission_income": comission,
             "total_accounts": account_count,
             "total_branches": branch_count,
         }
 
-    async def add_comission_to_bank(self, bank_id: int, fee: Decimal):
-        bank = await self.get_bank(bank_id)
-        if bank is None:
+    async def rebuild_stats(self, bank_id: int):
+        # Make sure every shard row exists, then lock them all: a bump that
+        # is still in flight either committed before we read the live totals
+        # or waits for us and is applied on top of the rebuilt row.
+        await self.session.execute(
+            insert(BankStats)
+            .values([
+                {"bank_id": bank_id, "shard": shard, "total_balance": 0, "account_count": 0, "branch_count": 0}
+                for shard in range(settings.BANK_STATS_SHARDS)
+            ])
+            .on_conflict_do_nothing(index_elements=[BankStats.bank_id, BankStats.shard])
+        )
+        await self.session.execute(
+            select(BankStats.shard)
+            .where(BankStats.bank_id == bank_id)
+            .order_by(BankStats.shard)
+            .with_for_update()
+        )
+        
+        stmt = await self.session.execute(
+            select(
+                select(func.coalesce(func.sum(Account.balance), 0))
+                .where(Account.bank_id == bank_id)
+                .scalar_subquery(),
+                select(func.count(Account.id))
+                .where(Account.bank_id == bank_id)
+                .scalar_subquery(),
+                select(func.count(Branch.id))
+                .where(Branch.bank_id == bank_id)
+                .scalar_subquery(),
+            )
+        )
+        total_balance, account_count, branch_count = stmt.one()
+        
+        # The rebuilt totals go to shard 0; the other shards start over.
+        await self.session.execute(
+            update(BankStats)
+            .where(BankStats.bank_id == bank_id)
+            .values(
+                total_balance=case((BankStats.shard == 0, literal(total_balance, MoneyType())), else_=0),
+                account_count=case((BankStats.shard == 0, account_count), else_=0),
+                branch_count=case((BankStats.shard == 0, branch_count), else_=0),
+            )
+        )
+        
+        await self.session.commit()
+
+    async def add_comission_to_bank(self, bank_id: int, fee: Decimal, commit: bool = True):
+        if not await reference_data.has_bank(self.session, bank_id):
             raise ValueError("Bank not found")
         
-        bank.comission_income += fee
+        # Spread writes over several shard rows so concurrent transfers do not
+        # all queue up on the single bank row.
+        stmt = insert(BankCommissionShard).values(
+            bank_id=bank_id,
+            shard=random.randrange(settings.COMISSION_SHARDS),
+            amount=fee,
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[BankCommissionShard.bank_id, BankCommissionShard.shard],
+                set_={"amount": BankCommissionShard.amount + stmt.excluded.amount},
+            )
+        )
+        
+        if commit:
+            await self.session.commit()
+
+    async def compact_comission(self, bank_id: int | None = None) -> dict[int, Decimal]:
+        # Lock in (bank_id, shard) order first, the order apply_transfers uses.
+        locked = (
+            select(BankCommissionShard.bank_id)
+            .order_by(BankCommissionShard.bank_id, BankCommissionShard.shard)
+            .with_for_update()
+        )
+        if bank_id is not None:
+            locked = locked.where(BankCommissionShard.bank_id == bank_id)
+        await self.session.execute(locked)
+        
+        stmt = delete(BankCommissionShard).returning(
+            BankCommissionShard.bank_id,
+            BankCommissionShard.amount,
+        )
+        if bank_id is not None:
+            stmt = stmt.where(BankCommissionShard.bank_id == bank_id)
+        
+        result = await self.session.execute(stmt)
+        
+        totals = defaultdict(Decimal)
+        for shard_bank_id, amount in result:
+            totals[shard_bank_id] += amount
+        
+        for shard_bank_id, amount in sorted(totals.items()):
+            await self.session.execute(
+                update(Bank)
+                .where(Bank.id == shard_bank_id)
+                .values(comission_income=Bank.comission_income + amount)
+            )
+        
+        await self.session.commit()
+        
+        return dict(totals)
+
+    async def compact_stats(self, bank_id: int | None = None) -> list[int]:
+        """Fold bank_stats shards into shard 0; returns the banks compacted."""
+        # Lock in (bank_id, shard) order first, the order bumps use.
+        locked = (
+            select(BankStats.bank_id)
+            .where(BankStats.shard != 0)
+            .order_by(BankStats.bank_id, BankStats.shard)
+            .with_for_update()
+        )
+        if bank_id is not None:
+            locked = locked.where(BankStats.bank_id == bank_id)
+        await self.session.execute(locked)
+        
+        stmt = (
+            delete(BankStats)
+            .where(BankStats.shard != 0)
+            .returning(
+                BankStats.bank_id,
+                BankStats.total_balance,
+                BankStats.account_count,
+                BankStats.branch_count,
+            )
+        )
+        if bank_id is not None:
+            stmt = stmt.where(BankStats.bank_id == bank_id)
+        
+        result = await self.session.execute(stmt)
+        
+        totals = defaultdict(lambda: [Decimal("0.00"), 0, 0])
+        for shard_bank_id, total_balance, account_count, branch_count in result:
+            total = totals[shard_bank_id]
+            total[0] += total_balance
+            total[1] += account_count
+            total[2] += branch_count
+        
+        if totals:
+            stmt = insert(BankStats).values([
+                {
+                    "bank_id": shard_bank_id,
+                    "shard": 0,
+                    "total_balance": total_balance,
+                    "account_count": account_count,
+                    "branch_count": branch_count,
+                }
+                for shard_bank_id, (total_balance, account_count, branch_count) in sorted(totals.items())
+            ])
+            await self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[BankStats.bank_id, BankStats.shard],
+                    set_={
+                        "total_balance": BankStats.total_balance + stmt.excluded.total_balance,
+                        "account_count": BankStats.account_count + stmt.excluded.account_count,
+                        "branch_count": BankStats.branch_count + stmt.excluded.branch_count,
+                    },
+                )
+            )
         
         await self.session.commit()
+        
+        return sorted(totals)
@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Protocol
+
+
+MISSING = object()
+
+
+class CacheBackend(Protocol):
+    """Optional second-level store shared between processes (e.g. Redis)."""
+
+    async def get(self, key: Hashable) -> Any:
+        """Return the stored value or MISSING."""
+
+    async def set(self, key: Hashable, value: Any, ttl: float):
+        ...
+
+    async def delete(self, key: Hashable):
+        ...
+
+
+class TTLCache:
+    """Bounded in-process cache with LRU eviction and per-entry expiry.
+
+    None is a legitimate value and is kept for negative_ttl seconds, so
+    repeated lookups of unknown keys do not reach the database either.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        backend: CacheBackend | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.backend = backend
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self.evictions = 0
+
+    def _ttl_for(self, value: Any) -> float:
+        return self.negative_ttl if value is None else self.ttl
+
+    def _store(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self._ttl_for(value), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+
+        if self.backend is not None:
+            value = await self.backend.get(key)
+            if value is not MISSING:
+                self._store(key, value)
+                self.backend_hits += 1
+                return value
+
+        self.misses += 1
+        return MISSING
+
+    async def set(self, key: Hashable, value: Any):
+        self._store(key, value)
+
+        if self.backend is not None:
+            await self.backend.set(key, value, self._ttl_for(value))
+
+    async def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "backend_hits": self.backend_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
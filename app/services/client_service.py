@@ -1,19 +1,111 @@
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from decimal import Decimal
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.lazy import Lazy
+from app.core.metrics import instrument_service
+from app.core.money import apply_rate, quantize_money
 
 from app.db.models.clients.models import Client
 from app.db.models.accounts.models import Account
 from app.db.models.transactions.models import OperationLog, OperationType, Transaction, TransactionType
 
+from app.services.audit import AuditWriter
 from app.services.bank_service import BankService
+from app.services.cache import MISSING, TTLCache
+from app.services.idempotency import (
+    cache_idempotent_result,
+    cached_idempotent_result,
+    claim_idempotency_key,
+    store_idempotent_result,
+)
+from app.services.ledger import record_transaction
+from app.services.balances import credit_account, debit_account
+from app.services.locking import LockMode, lock_accounts
+from app.services.reference_data import reference_data
+from app.services.stats import bump_bank_balances, bump_bank_stats
+from app.services.transfers import TransferItem, TransferResult, apply_transfers
+
 
+# Client rows never change once created, so lookups by telegram_id are safe
+# to serve from memory. Holds plain dicts so a shared backend can store them.
+client_cache: TTLCache = Lazy(lambda: TTLCache(
+    maxsize=settings.CLIENT_CACHE_SIZE,
+    ttl=settings.CLIENT_CACHE_TTL,
+    negative_ttl=settings.CLIENT_CACHE_NEGATIVE_TTL,
+))
 
+
+@instrument_service
 class ClientService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, audit: AuditWriter | None = None):
         self.session = session
+        self.audit = audit
+        self._pending_logs: list[tuple[int, OperationType, dict]] = []
+    
+    def _log(self, client_id: int, action: OperationType, data: dict):
+        if self.audit is None:
+            self.session.add(OperationLog(
+                client_id=client_id,
+                action=action,
+                data=data,
+            ))
+        else:
+            self._pending_logs.append((client_id, action, data))
+    
+    @asynccontextmanager
+    async def _claim(self, idempotency_key: str | None, operation: OperationType):
+        """Claims the key in a savepoint and yields the earlier balance, if any.
+        
+        If the operation fails, the savepoint is rolled back together with the
+        claim, so a later commit of the session cannot leave a key without a result.
+        A duplicate rolls the transaction back before its result is returned, so
+        no row locks taken for it outlive the call.
+        """
+        if idempotency_key is None:
+            yield None
+            return
+        
+        savepoint = await self.session.begin_nested()
+        try:
+            previous = await claim_idempotency_key(self.session, idempotency_key, operation)
+            if previous is not None:
+                await self.session.rollback()
+            
+            yield previous
+        except BaseException:
+            if savepoint.is_active:
+                await savepoint.rollback()
+            raise
+    
+    async def _commit(
+        self,
+        idempotency_key: str | None = None,
+        balance: Decimal | None = None,
+        operation: OperationType | None = None,
+    ):
+        if idempotency_key is not None:
+            await store_idempotent_result(self.session, idempotency_key, balance)
+        
+        try:
+            await self.session.commit()
+        except Exception:
+            self._pending_logs.clear()
+            raise
+        
+        if idempotency_key is not None:
+            await cache_idempotent_result(idempotency_key, operation, balance)
+        
+        # Audit rows are only handed to the writer once the operation is durable.
+        pending, self._pending_logs = self._pending_logs, []
+        if pending:
+            await self.audit.enqueue_committed(pending)
         
     async def create_client(self, telegram_id: int) -> Client:
         client = Client(
@@ -24,15 +116,34 @@ class ClientService:
         await self.session.commit()
         await self.session.refresh(client)
         
+        await client_cache.invalidate(telegram_id)
+        
         return client
     
     async def get_client_by_telegram_id(self, telegram_id: int) -> Client:
+        cached = await client_cache.get(telegram_id)
+        if cached is not MISSING:
+            if cached is None:
+                return None
+            
+            client = Client(**cached)
+            make_transient_to_detached(client)
+            
+            return await self.session.merge(client, load=False)
+        
         stmt = await self.session.execute(
             select(Client)
             .where(Client.telegram_id == telegram_id)
         )
         
-        return stmt.scalar_one_or_none()
+        client = stmt.scalar_one_or_none()
+        
+        await client_cache.set(
+            telegram_id,
+            None if client is None else {"id": client.id, "telegram_id": client.telegram_id},
+        )
+        
+        return client
     
     async def open_account(self, bank_id: int, client_id: int) -> Optional[Client]:
         account = Account(
@@ -44,15 +155,13 @@ class ClientService:
         self.session.add(account)
         await self.session.flush()
         
-        self.session.add(OperationLog(
-            client_id=client_id,
-            action=OperationType.create_account,
-            data={
-                "account_id": account.id
-            }
-        ))
+        await bump_bank_stats(self.session, bank_id, accounts=1)
         
-        await self.session.commit()
+        self._log(client_id, OperationType.create_account, {
+            "account_id": account.id
+        })
+        
+        await self._commit()
         
         return account
 
@@ -70,88 +179,101 @@ class ClientService:
         
         await self.session.delete(account)
         
-        self.session.add(OperationLog(
-            client_id=client_id,
-            action=OperationType.close_account,
-            data={
-                "account_id": account_id,
-            }
-        ))
-        
-        await self.session.commit()
-        
-    async def deposit(self, account_id: int, amount: Decimal, client_id):
-        if amount <= 0:
-            raise ValueError("Amount must be greater than zero")
-        
-        result = await self.session.execute(
-            select(Account)
-            .where(Account.id == account_id)
+        await bump_bank_stats(
+            self.session,
+            account.bank_id,
+            balance=-account.balance,
+            accounts=-1,
         )
         
-        account = result.scalar_one_or_none()
-        
-        account.balance += amount
+        self._log(client_id, OperationType.close_account, {
+            "account_id": account_id,
+        })
         
-        transaction = Transaction(
-            from_account_id=None,
-            to_account_id=account_id,
-            amount=amount,
-            fee="0.00",
-            type=TransactionType.deposit,
-        )
+        await self._commit()
         
-        self.session.add(transaction)
+    async def deposit(
+        self,
+        account_id: int,
+        amount: Decimal,
+        client_id,
+        idempotency_key: str | None = None,
+    ) -> Decimal:
+        # Checked after rounding: 0.004 would otherwise pass and move nothing.
+        amount = quantize_money(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
         
-        self.session.add(OperationLog(
-            client_id=client_id,
-            action=OperationType.deposit,
-            data={
+        async with self._claim(idempotency_key, OperationType.deposit) as previous:
+            if previous is not None:
+                return previous
+            
+            account = await credit_account(self.session, account_id, amount)
+            
+            transaction = Transaction(
+                from_account_id=None,
+                to_account_id=account_id,
+                amount=amount,
+                fee="0.00",
+                type=TransactionType.deposit,
+            )
+            
+            await record_transaction(self.session, transaction, [
+                (account_id, amount, account.balance),
+            ])
+            
+            self._log(client_id, OperationType.deposit, {
                 "client_id": client_id,
-                "amount": amount,
-            }
-        ))
-        
-        await self.session.commit()
+                "amount": str(amount),
+            })
+            
+            await self._commit(idempotency_key, account.balance, OperationType.deposit)
+            
+            return account.balance
 
-    async def withdraw(self, account_id: int, amount: Decimal, client_id: int):
+    async def withdraw(
+        self,
+        account_id: int,
+        amount: Decimal,
+        client_id: int,
+        idempotency_key: str | None = None,
+    ) -> Decimal:
+        # Checked after rounding: 0.004 would otherwise pass and move nothing.
+        amount = quantize_money(amount)
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
-        result = await self.session.execute(
-            select(Account)
-            .where(Account.id == account_id)
-        )
-        
-        account = result.scalar_one_or_none()
-        
-        if not account:
-            raise ValueError(f"Account with id={account_id} not found")
-        if account.balance < amount:
-            raise ValueError("Not enough money on balance")
-        
-        account.balance -= amount
-        
-        transaction = Transaction(
-            from_account_id=account_id,
-            to_account_id=None,
-            amount=amount,
-            fee="0.00",
-            type=TransactionType.withdraw,
-        )
-        
-        self.session.add(transaction)
-        
-        self.session.add(OperationLog(
-            client_id=client_id,
-            action=OperationType.withdraw,
-            data={
+        async with self._claim(idempotency_key, OperationType.withdraw) as previous:
+            if previous is not None:
+                return previous
+            
+            account = await debit_account(
+                self.session,
+                account_id,
+                amount,
+                error="Not enough money on balance",
+            )
+            
+            transaction = Transaction(
+                from_account_id=account_id,
+                to_account_id=None,
+                amount=amount,
+                fee="0.00",
+                type=TransactionType.withdraw,
+            )
+            
+            await record_transaction(self.session, transaction, [
+                (account_id, -amount, account.balance),
+            ])
+            
+            self._log(client_id, OperationType.withdraw, {
                 "client_id": client_id,
                 "amount": str(amount),
-            }
-        ))
-        
-        await self.session.commit()
+            })
+            
+            await self._commit(idempotency_key, account.balance, OperationType.withdraw)
+            
+            return account.balance
 
     async def transfer(
         self,
@@ -159,61 +281,105 @@ class ClientService:
         to_account_id: int,
         amount: Decimal,
         client_id: int,
-        fee_percent: Decimal = Decimal("0.001")
-    ):
-        stmt_from = await self.session.execute(
-            select(Account)
-            .where(Account.id == from_account_id)
-        )
-        stmt_to = await self.session.execute(
-            select(Account)
-            .where(Account.id == to_account_id)
-        )
-        
-        from_account = stmt_from.scalar_one_or_none()
-        to_account = stmt_to.scalar_one_or_none()
-        
+        fee_percent: Decimal | None = None,
+        lock_mode: LockMode = LockMode.wait,
+        idempotency_key: str | None = None,
+    ) -> Decimal:
+        # Checked after rounding: 0.004 would otherwise pass and move nothing.
+        amount = quantize_money(amount)
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
-        if from_account is None:
-            raise ValueError(f"Client with id={from_account_id} not found")
-        
-        if to_account is None:
-            raise ValueError(f"Client with id={to_account_id} not found")
+        # A redelivered transfer is answered without touching the account rows.
+        if idempotency_key is not None:
+            previous = await cached_idempotent_result(idempotency_key, OperationType.transfer)
+            if previous is not None:
+                return previous
         
-        if from_account.bank_id != to_account.bank_id:
-            fee_percent = Decimal("0.01")
-        
-        fee = amount * fee_percent
-        total_amount = amount + fee
-            
-        if total_amount > from_account.balance:
-            raise ValueError("Not enough money")
-        
-        from_account.balance -= total_amount
-        to_account.balance += amount
-        
-        bank_service = BankService(self.session)
-        bank_service.add_comission_to_bank(from_account.bank_id, fee)
-        
-        transaction = Transaction(
-            from_account_id=from_account_id,
-            to_account_id=to_account_id,
-            amount=amount,
-            fee=fee_percent,
-            type=TransactionType.transfer,
+        accounts = await lock_accounts(
+            self.session,
+            [from_account_id, to_account_id],
+            mode=lock_mode,
         )
         
-        self.session.add(transaction)
-        
-        self.session.add(OperationLog(
-            client_id=client_id,
-            action=OperationType.transfer,
-            data={
+        async with self._claim(idempotency_key, OperationType.transfer) as previous:
+            if previous is not None:
+                return previous
+            
+            from_account = accounts.get(from_account_id)
+            to_account = accounts.get(to_account_id)
+            
+            if from_account is None:
+                raise ValueError(f"Client with id={from_account_id} not found")
+            
+            if to_account is None:
+                raise ValueError(f"Client with id={to_account_id} not found")
+            
+            await reference_data.ensure_fresh(self.session)
+            if fee_percent is None or from_account.bank_id != to_account.bank_id:
+                fee_percent = reference_data.fee_rate(from_account.bank_id, to_account.bank_id)
+            
+            fee = quantize_money(amount * fee_percent)
+            total_amount = amount + fee
+            
+            if total_amount > from_account.balance:
+                raise ValueError("Not enough money")
+            
+            from_account.balance -= total_amount
+            from_balance_after = from_account.balance
+            to_account.balance += amount
+            
+            balances = defaultdict(Decimal)
+            balances[from_account.bank_id] -= total_amount
+            balances[to_account.bank_id] += amount
+            await bump_bank_balances(self.session, balances)
+            
+            bank_service = BankService(self.session)
+            await bank_service.add_comission_to_bank(from_account.bank_id, fee, commit=False)
+            
+            transaction = Transaction(
+                from_account_id=from_account_id,
+                to_account_id=to_account_id,
+                amount=amount,
+                fee=fee,
+                type=TransactionType.transfer,
+            )
+            
+            await record_transaction(self.session, transaction, [
+                (from_account_id, -total_amount, from_balance_after),
+                (to_account_id, amount, to_account.balance),
+            ])
+            
+            self._log(client_id, OperationType.transfer, {
                 "client_id": client_id,
                 "amount": str(amount),
-            }
-        ))
-        
-        await self.session.commit()
+            })
+            
+            await self._commit(idempotency_key, from_account.balance, OperationType.transfer)
+            
+            return from_account.balance
+
+    async def transfer_many(
+        self,
+        batch: list[TransferItem],
+        fee_percent: Decimal | None = None,
+    ) -> list[TransferResult]:
+        await reference_data.ensure_fresh(self.session)
+        
+        def fee_policy(amount: int, from_bank_id: int, to_bank_id: int):
+            if fee_percent is not None and from_bank_id == to_bank_id:
+                percent = fee_percent
+            else:
+                percent = reference_data.fee_rate(from_bank_id, to_bank_id)
+            fee = apply_rate(amount, percent)
+            
+            return amount + fee, amount, fee
+        
+        return await apply_transfers(
+            self.session,
+            batch,
+            fee_policy,
+            collect_comission=True,
+            log_operations=True,
+            audit=self.audit,
+        )
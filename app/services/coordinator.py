@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from decimal import Decimal
+
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.money import quantize_money
+from app.services.audit import AuditWriter
+from app.services.client_service import ClientService
+from app.services.transfers import TransferItem, TransferResult
+
+
+logger = logging.getLogger(__name__)
+
+
+# Errors caused by an item of the batch; anything else is not worth retrying.
+BISECT_ERRORS = (IntegrityError, DataError, ValueError)
+
+
+class TransferCoordinator:
+    """Group commit for transfers.
+
+    Concurrent transfer() calls are queued and applied together: a batch
+    closes max_wait seconds after its first request or at max_batch items,
+    whichever comes first, and goes through ClientService.transfer_many in
+    one transaction with ordered locks. Each caller gets its own balance or
+    ValueError back. `workers` batches may be in flight at once, so the
+    next batch fills up while the previous one commits.
+
+    A batch rejected by the database for its data (IntegrityError, DataError,
+    ValueError) is split in halves and retried, at most max_bisect_depth
+    times, so only the transfer that breaks it fails. Connection, pool and
+    timeout errors fail the whole batch at once.
+
+    Idempotency keys are not supported here; use ClientService.transfer for
+    those. A transfer whose caller was cancelled is still applied.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        max_batch: int = 256,
+        max_wait: float = 0.002,
+        workers: int = 2,
+        fee_percent: Decimal | None = None,
+        audit: AuditWriter | None = None,
+        max_queue: int = 10_000,
+        max_bisect_depth: int = 8,
+    ):
+        self.session_maker = session_maker
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.workers = workers
+        self.fee_percent = fee_percent
+        self.audit = audit
+        self.max_bisect_depth = max_bisect_depth
+        self.queue: asyncio.Queue[tuple[TransferItem, asyncio.Future]] = asyncio.Queue(maxsize=max_queue)
+        self.batches = 0
+        self.applied = 0
+        self._stopping = False
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        if not self._tasks:
+            self._stopping = False
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        if not self._tasks:
+            return
+
+        self._stopping = True
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    async def transfer(
+        self,
+        from_account_id: int,
+        to_account_id: int,
+        amount: Decimal,
+        client_id: int,
+    ) -> Decimal:
+        if self._stopping or not self._tasks:
+            raise RuntimeError("Transfer coordinator is not running")
+        amount = quantize_money(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((
+            TransferItem(
+                from_account_id=from_account_id,
+                to_account_id=to_account_id,
+                amount=amount,
+                client_id=client_id,
+            ),
+            future,
+        ))
+
+        result: TransferResult = await future
+        if not result.ok:
+            raise ValueError(result.error)
+
+        return result.balance
+
+    async def _collect(self) -> list[tuple[TransferItem, asyncio.Future]]:
+        batch = []
+        loop = asyncio.get_running_loop()
+
+        # Wake up now and then while idle to notice stop().
+        try:
+            batch.append(await asyncio.wait_for(self.queue.get(), 0.1))
+        except TimeoutError:
+            return batch
+
+        # The window starts with the first request, which bounds its latency.
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0 or self._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def _apply(self, batch: list[tuple[TransferItem, asyncio.Future]], depth: int = 0):
+        try:
+            async with self.session_maker() as session:
+                service = ClientService(session, audit=self.audit)
+                results = await service.transfer_many(
+                    [item for item, _ in batch],
+                    fee_percent=self.fee_percent,
+                )
+        except Exception as error:
+            # Nothing was committed. Bisect until the failing transfer is on
+            # its own, so one bad item does not fail the rest of the batch.
+            logger.warning("Transfer batch of %d failed: %s", len(batch), error)
+            bisect = isinstance(error, BISECT_ERRORS) and depth < self.max_bisect_depth
+            if bisect and len(batch) > 1:
+                middle = len(batch) // 2
+                await self._apply(batch[:middle], depth + 1)
+                await self._apply(batch[middle:], depth + 1)
+                return
+
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.batches += 1
+        self.applied += len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+
+            if batch:
+                await self._apply(batch)
+            elif self._stopping and self.queue.empty():
+                return
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.lazy import Lazy
+from app.db.models.transactions.models import IdempotencyKey, OperationType
+from app.services.cache import MISSING, TTLCache
+
+
+# Completed results only; redelivered updates are answered from here first.
+# Holds plain dicts with the operation, so a shared backend can store them.
+idempotency_cache: TTLCache = Lazy(lambda: TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_TTL,
+))
+
+
+def _previous_balance(key: str, operation: OperationType, previous_operation: OperationType, result: dict) -> Decimal:
+    if previous_operation != operation:
+        raise ValueError(f"Idempotency key {key!r} was already used for {previous_operation.value}")
+
+    return Decimal(result["balance"])
+
+
+async def cached_idempotent_result(key: str, operation: OperationType) -> Decimal | None:
+    """The balance a completed use of `key` produced, if it is cached."""
+    cached = await idempotency_cache.get(key)
+    if cached is MISSING:
+        return None
+
+    return _previous_balance(key, operation, OperationType(cached["operation"]), cached)
+
+
+async def cache_idempotent_result(key: str, operation: OperationType, balance: Decimal):
+    await idempotency_cache.set(key, {"operation": operation.value, "balance": str(balance)})
+
+
+async def claim_idempotency_key(
+    session: AsyncSession,
+    key: str,
+    operation: OperationType,
+) -> Decimal | None:
+    """Reserve `key` inside the caller's transaction.
+
+    Returns None when the operation should run, or the balance it produced
+    the first time when `key` was already used. A concurrent duplicate waits
+    on the unique index until the first request commits or rolls back. A
+    key committed without a result was never applied and is claimed again.
+    """
+    cached = await cached_idempotent_result(key, operation)
+    if cached is not None:
+        return cached
+
+    expires_at = datetime.now() + timedelta(seconds=settings.IDEMPOTENCY_TTL)
+    stmt = insert(IdempotencyKey).values(
+        key=key,
+        operation=operation,
+        expires_at=expires_at,
+    )
+    claimed = await session.scalar(
+        stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "operation": operation,
+                "result": None,
+                "created_at": func.now(),
+                "expires_at": expires_at,
+            },
+            where=or_(IdempotencyKey.expires_at < func.now(), IdempotencyKey.result.is_(None)),
+        )
+        .returning(IdempotencyKey.key)
+    )
+    if claimed is not None:
+        return None
+
+    stmt = await session.execute(
+        select(IdempotencyKey.operation, IdempotencyKey.result)
+        .where(IdempotencyKey.key == key)
+    )
+    previous_operation, result = stmt.one()
+
+    balance = _previous_balance(key, operation, previous_operation, result)
+    await cache_idempotent_result(key, operation, balance)
+
+    return balance
+
+
+async def store_idempotent_result(session: AsyncSession, key: str, balance: Decimal):
+    await session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(result={"balance": str(balance)})
+    )
+
+
+async def purge_expired_keys(session: AsyncSession) -> int:
+    result = await session.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.expires_at < func.now())
+    )
+    await session.commit()
+
+    return result.rowcount
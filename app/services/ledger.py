@@ -0,0 +1,50 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.db.models.transactions.models import LedgerEntry, Transaction
+
+
+# (account_id, signed amount, balance after posting)
+Posting = tuple[int, Decimal, Decimal]
+
+
+async def record_transaction(
+    session: AsyncSession,
+    transaction: Transaction,
+    postings: list[Posting],
+) -> Transaction:
+    """Add `transaction` and its ledger postings to the session.
+
+    The transaction is flushed for its id; postings go out with the commit.
+    Callers must hold the lock on (or have just updated) every account
+    they post to, so balance_after is the true running balance.
+    """
+    session.add(transaction)
+    await session.flush()
+
+    session.add_all([
+        LedgerEntry(
+            transaction_id=transaction.id,
+            account_id=account_id,
+            amount=amount,
+            balance_after=balance_after,
+        )
+        for account_id, amount, balance_after in postings
+    ])
+
+    return transaction
+
+
+async def balance_at(session: AsyncSession, account_id: int, at: datetime) -> Decimal:
+    # One index-only lookup on (account_id, created_at, id) INCLUDE balance_after.
+    balance = await session.scalar(
+        select(LedgerEntry.balance_after)
+        .where(LedgerEntry.account_id == account_id, LedgerEntry.created_at <= at)
+        .order_by(LedgerEntry.created_at.desc(), LedgerEntry.id.desc())
+        .limit(1)
+    )
+
+    return Decimal("0.00") if balance is None else balance
@@ -0,0 +1,91 @@
+import asyncio
+import random
+from enum import Enum
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+
+from app.db.models.accounts.models import Account
+
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class LockMode(str, Enum):
+    none = "none"
+    wait = "wait"
+    nowait = "nowait"
+    skip_locked = "skip_locked"
+
+
+def _is_lock_not_available(error: DBAPIError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == LOCK_NOT_AVAILABLE
+
+
+async def _backoff(attempt: int, base_delay: float, max_delay: float):
+    delay = min(max_delay, base_delay * 2 ** attempt)
+    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+
+def lock_accounts_query(account_ids: list[int], mode: LockMode = LockMode.wait):
+    # Rows are always requested in ascending id order within one statement,
+    # so two transfers touching the same pair of accounts cannot deadlock.
+    stmt = (
+        select(Account)
+        .where(Account.id.in_(sorted(set(account_ids))))
+        .order_by(Account.id)
+    )
+    if mode == LockMode.wait:
+        stmt = stmt.with_for_update()
+    elif mode == LockMode.nowait:
+        stmt = stmt.with_for_update(nowait=True)
+    elif mode == LockMode.skip_locked:
+        stmt = stmt.with_for_update(skip_locked=True)
+
+    return stmt
+
+
+async def lock_accounts(
+    session: AsyncSession,
+    account_ids: list[int],
+    mode: LockMode = LockMode.wait,
+    retries: int = 5,
+    base_delay: float = 0.005,
+    max_delay: float = 0.2,
+) -> dict[int, Account]:
+    account_ids = sorted(set(account_ids))
+    stmt = lock_accounts_query(account_ids, mode)
+
+    # Each attempt runs in a savepoint, so a retry releases only its own
+    # locks and leaves the caller's earlier work in the transaction alone.
+    for attempt in range(retries + 1):
+        savepoint = await session.begin_nested()
+        try:
+            result = await session.scalars(stmt)
+        except DBAPIError as e:
+            await savepoint.rollback()
+            if mode != LockMode.nowait or not _is_lock_not_available(e):
+                raise
+        else:
+            accounts = {account.id: account for account in result}
+
+            if mode != LockMode.skip_locked or len(accounts) == len(account_ids):
+                await savepoint.commit()
+                return accounts
+
+            missing = [account_id for account_id in account_ids if account_id not in accounts]
+            existing = await session.scalars(
+                select(Account.id)
+                .where(Account.id.in_(missing))
+            )
+            if not existing.all():
+                await savepoint.commit()
+                return accounts
+
+            await savepoint.rollback()
+
+        if attempt < retries:
+            await _backoff(attempt, base_delay, max_delay)
+
+    raise ValueError(f"Accounts {account_ids} are locked by other operations")
@@ -0,0 +1,293 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import BigInteger, case, func, literal, select, tuple_, type_coerce, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.money import Money, from_cents
+from app.db.models.accounts.models import Account
+from app.db.models.banks.models import Bank, BankCommissionShard
+from app.db.models.transactions.models import (
+    ReconciledAccount,
+    ReconciledBank,
+    ReconciliationWatermark,
+    Transaction,
+    TransactionType,
+)
+
+
+WATERMARK = "transaction"
+
+
+@dataclass
+class AccountDrift:
+    account_id: int
+    bank_id: int
+    balance: Decimal
+    expected: Decimal
+
+
+@dataclass
+class BankDrift:
+    bank_id: int
+    comission: Decimal
+    expected: Decimal
+
+
+@dataclass
+class ReconciliationReport:
+    transactions_folded: int = 0
+    accounts: list[AccountDrift] = field(default_factory=list)
+    banks: list[BankDrift] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.accounts and not self.banks
+
+
+def _cents(column):
+    return type_coerce(column, BigInteger)
+
+
+async def _lock_watermark(session: AsyncSession) -> ReconciliationWatermark:
+    await session.execute(
+        insert(ReconciliationWatermark)
+        .values(name=WATERMARK, transactions=0, updated_at=func.now())
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    return await session.scalar(
+        select(ReconciliationWatermark)
+        .where(ReconciliationWatermark.name == WATERMARK)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _checkpoint(
+    session: AsyncSession,
+    position: tuple[datetime | None, int | None],
+    last: tuple[datetime, int],
+    count: int,
+    balances: dict[int, int],
+    comissions: dict[int, int],
+):
+    watermark = await _lock_watermark(session)
+    if (watermark.last_created_at, watermark.last_transaction_id) != position:
+        raise ValueError("Reconciliation watermark moved; is another run in progress?")
+
+    # Sorted, so concurrent writers would lock rows in the same order.
+    if balances:
+        stmt = insert(ReconciledAccount)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ReconciledAccount.account_id],
+                set_={"balance": ReconciledAccount.balance + stmt.excluded.balance},
+            ),
+            [
+                {"account_id": account_id, "balance": Money(cents)}
+                for account_id, cents in sorted(balances.items())
+            ],
+        )
+    if comissions:
+        stmt = insert(ReconciledBank)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ReconciledBank.bank_id],
+                set_={"comission": ReconciledBank.comission + stmt.excluded.comission},
+            ),
+            [
+                {"bank_id": bank_id, "comission": Money(cents)}
+                for bank_id, cents in sorted(comissions.items())
+            ],
+        )
+
+    watermark.last_created_at, watermark.last_transaction_id = last
+    watermark.transactions += count
+    watermark.updated_at = func.now()
+
+    await session.commit()
+
+
+async def fold_transactions(
+    read_session: AsyncSession,
+    write_session: AsyncSession,
+    chunk_size: int | None = None,
+    lag_seconds: float | None = None,
+) -> int:
+    """Fold transactions past the watermark into the reconciled totals.
+
+    Rows are streamed in (created_at, id) order through a server-side cursor
+    on `read_session`; each chunk's per-account and per-bank sums are added
+    on `write_session` and committed together with the new watermark, so an
+    interrupted run resumes after its last chunk. Returns the number of
+    transactions folded.
+    """
+    chunk_size = chunk_size or settings.RECONCILE_CHUNK_SIZE
+    lag_seconds = settings.RECONCILE_LAG_SECONDS if lag_seconds is None else lag_seconds
+
+    watermark = await _lock_watermark(write_session)
+    position = (watermark.last_created_at, watermark.last_transaction_id)
+    await write_session.commit()
+
+    stmt = (
+        select(
+            Transaction.id,
+            Transaction.created_at,
+            Transaction.type,
+            Transaction.from_account_id,
+            Transaction.to_account_id,
+            _cents(Transaction.amount).label("amount"),
+            _cents(Transaction.fee).label("fee"),
+            Account.bank_id.label("from_bank_id"),
+        )
+        .outerjoin(Account, Account.id == Transaction.from_account_id)
+        .where(Transaction.created_at < func.localtimestamp() - timedelta(seconds=lag_seconds))
+        .order_by(Transaction.created_at, Transaction.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if position[0] is not None:
+        stmt = stmt.where(tuple_(Transaction.created_at, Transaction.id) > tuple_(*position))
+
+    folded = 0
+    result = await read_session.stream(stmt)
+
+    async for chunk in result.partitions(chunk_size):
+        balances = defaultdict(int)
+        comissions = defaultdict(int)
+
+        for row in chunk:
+            # The sender paid amount + fee, the recipient got amount.
+            if row.to_account_id is not None:
+                balances[row.to_account_id] += row.amount
+            if row.from_account_id is not None:
+                balances[row.from_account_id] -= row.amount + row.fee
+
+            if row.type == TransactionType.transfer and row.fee:
+                comissions[row.from_bank_id] += row.fee
+            elif row.type == TransactionType.maintenance_fee:
+                comissions[row.from_bank_id] += row.amount
+
+        last = (chunk[-1].created_at, chunk[-1].id)
+        await _checkpoint(write_session, position, last, len(chunk), balances, comissions)
+        position = last
+        folded += len(chunk)
+
+    await read_session.commit()
+
+    return folded
+
+
+def _past_watermark():
+    # Evaluated inside the checking statement, so the watermark, the
+    # reconciled totals and the live balances all come from one snapshot.
+    watermark = select(ReconciliationWatermark).where(ReconciliationWatermark.name == WATERMARK)
+    return tuple_(Transaction.created_at, Transaction.id) > tuple_(
+        func.coalesce(watermark.with_only_columns(ReconciliationWatermark.last_created_at).scalar_subquery(), literal(datetime.min)),
+        func.coalesce(watermark.with_only_columns(ReconciliationWatermark.last_transaction_id).scalar_subquery(), 0),
+    )
+
+
+async def find_account_drift(session: AsyncSession, limit: int | None = None) -> list[AccountDrift]:
+    after = _past_watermark()
+    credits = select(
+        Transaction.to_account_id.label("account_id"),
+        _cents(Transaction.amount).label("amount"),
+    ).where(after, Transaction.to_account_id.is_not(None))
+    debits = select(
+        Transaction.from_account_id.label("account_id"),
+        -(_cents(Transaction.amount) + _cents(Transaction.fee)),
+    ).where(after, Transaction.from_account_id.is_not(None))
+    moves = union_all(credits, debits).subquery("moves")
+    tail = (
+        select(moves.c.account_id, func.sum(moves.c.amount).label("amount"))
+        .group_by(moves.c.account_id)
+        .subquery("tail")
+    )
+
+    balance = _cents(Account.balance)
+    expected = func.coalesce(_cents(ReconciledAccount.balance), 0) + func.coalesce(tail.c.amount, 0)
+
+    stmt = (
+        select(Account.id, Account.bank_id, balance.label("balance"), expected.label("expected"))
+        .outerjoin(ReconciledAccount, ReconciledAccount.account_id == Account.id)
+        .outerjoin(tail, tail.c.account_id == Account.id)
+        .where(balance != expected)
+        .order_by(Account.id)
+        .limit(limit)
+    )
+
+    return [
+        AccountDrift(
+            account_id=row.id,
+            bank_id=row.bank_id,
+            balance=from_cents(row.balance),
+            expected=from_cents(row.expected),
+        )
+        for row in await session.execute(stmt)
+    ]
+
+
+async def find_bank_drift(session: AsyncSession) -> list[BankDrift]:
+    # Banks earn transfer fees charged to their senders and maintenance fees.
+    earned = case(
+        (Transaction.type == TransactionType.maintenance_fee, _cents(Transaction.amount)),
+        else_=_cents(Transaction.fee),
+    )
+    tail = (
+        select(Account.bank_id, func.sum(earned).label("amount"))
+        .select_from(Transaction)
+        .join(Account, Account.id == Transaction.from_account_id)
+        .where(
+            _past_watermark(),
+            Transaction.type.in_([TransactionType.transfer, TransactionType.maintenance_fee]),
+        )
+        .group_by(Account.bank_id)
+        .subquery("tail")
+    )
+    shards = (
+        select(BankCommissionShard.bank_id, func.sum(_cents(BankCommissionShard.amount)).label("amount"))
+        .group_by(BankCommissionShard.bank_id)
+        .subquery("shards")
+    )
+
+    comission = _cents(Bank.comission_income) + func.coalesce(shards.c.amount, 0)
+    expected = func.coalesce(_cents(ReconciledBank.comission), 0) + func.coalesce(tail.c.amount, 0)
+
+    stmt = (
+        select(Bank.id, comission.label("comission"), expected.label("expected"))
+        .outerjoin(ReconciledBank, ReconciledBank.bank_id == Bank.id)
+        .outerjoin(tail, tail.c.bank_id == Bank.id)
+        .outerjoin(shards, shards.c.bank_id == Bank.id)
+        .where(comission != expected)
+        .order_by(Bank.id)
+    )
+
+    return [
+        BankDrift(
+            bank_id=row.id,
+            comission=from_cents(row.comission),
+            expected=from_cents(row.expected),
+        )
+        for row in await session.execute(stmt)
+    ]
+
+
+async def reconcile(
+    read_session: AsyncSession,
+    write_session: AsyncSession,
+    chunk_size: int | None = None,
+    lag_seconds: float | None = None,
+    limit: int | None = None,
+) -> ReconciliationReport:
+    report = ReconciliationReport()
+    report.transactions_folded = await fold_transactions(read_session, write_session, chunk_size, lag_seconds)
+
+    report.accounts = await find_account_drift(read_session, limit=limit)
+    report.banks = await find_bank_drift(read_session)
+    await read_session.commit()
+
+    return report
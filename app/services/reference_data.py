@@ -0,0 +1,105 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.lazy import Lazy
+from app.db.models.banks.models import Bank, BankFeeSchedule, ReferenceDataVersion
+
+
+@dataclass(frozen=True)
+class FeeRule:
+    same_bank_rate: Decimal
+    cross_bank_rate: Decimal
+
+
+DEFAULT_FEE_RULE = FeeRule(
+    same_bank_rate=Decimal("0.001"),
+    cross_bank_rate=Decimal("0.01"),
+)
+
+
+class ReferenceData:
+    """In-process copy of bank metadata and fee schedules.
+
+    Reloaded only when reference_data_version changes; the version itself is
+    polled at most once per refresh_interval, so fee calculation normally
+    touches no database at all.
+    """
+
+    def __init__(self, refresh_interval: float = 5.0):
+        self.refresh_interval = refresh_interval
+        self.banks: dict[int, str] = {}
+        self.fee_rules: dict[int, FeeRule] = {}
+        self.version: int | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, session: AsyncSession, force: bool = False):
+        if not force and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+
+        async with self._lock:
+            if not force and time.monotonic() - self._checked_at < self.refresh_interval:
+                return
+
+            version = await session.scalar(
+                select(ReferenceDataVersion.version)
+                .where(ReferenceDataVersion.id == 1)
+            )
+            if version is None or version != self.version:
+                await self._load(session)
+                self.version = version
+
+            self._checked_at = time.monotonic()
+
+    async def _load(self, session: AsyncSession):
+        banks = await session.execute(select(Bank.id, Bank.name))
+        fee_rules = await session.execute(
+            select(
+                BankFeeSchedule.bank_id,
+                BankFeeSchedule.same_bank_rate,
+                BankFeeSchedule.cross_bank_rate,
+            )
+        )
+
+        self.banks = {bank_id: name for bank_id, name in banks}
+        self.fee_rules = {
+            bank_id: FeeRule(same_bank_rate=same_bank_rate, cross_bank_rate=cross_bank_rate)
+            for bank_id, same_bank_rate, cross_bank_rate in fee_rules
+        }
+
+    async def has_bank(self, session: AsyncSession, bank_id: int) -> bool:
+        await self.ensure_fresh(session)
+        if bank_id in self.banks:
+            return True
+
+        # Could be a bank created by another process since the last refresh.
+        await self.ensure_fresh(session, force=True)
+        return bank_id in self.banks
+
+    def fee_rule(self, bank_id: int) -> FeeRule:
+        return self.fee_rules.get(bank_id, DEFAULT_FEE_RULE)
+
+    def fee_rate(self, from_bank_id: int, to_bank_id: int) -> Decimal:
+        rule = self.fee_rule(from_bank_id)
+        return rule.same_bank_rate if from_bank_id == to_bank_id else rule.cross_bank_rate
+
+    def invalidate(self):
+        self.version = None
+        self._checked_at = 0.0
+
+
+async def bump_reference_version(session: AsyncSession):
+    await session.execute(
+        update(ReferenceDataVersion)
+        .where(ReferenceDataVersion.id == 1)
+        .values(version=ReferenceDataVersion.version + 1)
+    )
+
+
+reference_data: ReferenceData = Lazy(lambda: ReferenceData(refresh_interval=settings.REFERENCE_DATA_REFRESH_INTERVAL))
@@ -0,0 +1,70 @@
+import random
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.models.banks.models import BankStats
+
+
+def _shard(session: AsyncSession) -> int:
+    # One shard per session: every bump in a transaction lands on the same
+    # shard, so rows are still locked in bank_id order and cannot deadlock.
+    shard = session.info.get("bank_stats_shard")
+    if shard is None:
+        shard = session.info["bank_stats_shard"] = random.randrange(settings.BANK_STATS_SHARDS)
+    
+    return shard
+
+
+async def _upsert_bank_stats(session: AsyncSession, rows: list[dict]):
+    if not rows:
+        return
+    
+    # Rows go out sorted by bank_id in one statement, so transactions touching
+    # several banks always lock their stats rows in the same order. Writes are
+    # spread over BANK_STATS_SHARDS rows per bank so concurrent money movement
+    # inside one bank does not queue up on a single row.
+    shard = _shard(session)
+    rows = sorted(({**row, "shard": shard} for row in rows), key=lambda row: row["bank_id"])
+    
+    stmt = insert(BankStats).values(rows)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[BankStats.bank_id, BankStats.shard],
+            set_={
+                "total_balance": BankStats.total_balance + stmt.excluded.total_balance,
+                "account_count": BankStats.account_count + stmt.excluded.account_count,
+                "branch_count": BankStats.branch_count + stmt.excluded.branch_count,
+            },
+        )
+    )
+
+
+async def bump_bank_stats(
+    session: AsyncSession,
+    bank_id: int,
+    balance: Decimal = Decimal("0.00"),
+    accounts: int = 0,
+    branches: int = 0,
+):
+    await _upsert_bank_stats(session, [{
+        "bank_id": bank_id,
+        "total_balance": balance,
+        "account_count": accounts,
+        "branch_count": branches,
+    }])
+
+
+async def bump_bank_balances(session: AsyncSession, balances: dict[int, Decimal]):
+    await _upsert_bank_stats(session, [
+        {
+            "bank_id": bank_id,
+            "total_balance": balance,
+            "account_count": 0,
+            "branch_count": 0,
+        }
+        for bank_id, balance in balances.items()
+        if balance
+    ])
@@ -1,51 +1,163 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
+from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, union_all
+from sqlalchemy.orm import aliased
 
-from app.db.models.accounts.models import Account
+from app.core.metrics import instrument_service
+from app.core.money import apply_rate, quantize_money
 from app.db.models.transactions.models import Transaction, TransactionType
+from app.services.bank_service import BankService
+from app.services.ledger import record_transaction
+from app.services.locking import LockMode, lock_accounts
+from app.services.reference_data import reference_data
+from app.services.stats import bump_bank_balances
+from app.services.transfers import TransferItem, TransferResult, apply_transfers
 
 
+@dataclass
+class StatementPage:
+    transactions: list[Transaction]
+    # Pass back as `after` to resume the statement right after this page.
+    next_cursor: tuple[datetime, int]
+
+
+def statement_query(
+    account_id: int,
+    after: tuple[datetime, int] | None = None,
+    limit: int | None = None,
+):
+    """An account's transactions in (created_at, id) order, past `after`.
+
+    Outgoing and incoming transactions are read as two branches, each an
+    ordered range scan of its (x_account_id, created_at, id) index with its
+    own keyset predicate, merged in order (a Merge Append when unlimited), so
+    rows can be streamed as they are read. A self-transfer is emitted once.
+    """
+    def branch(column, *criteria):
+        stmt = select(Transaction).where(column == account_id, *criteria)
+        if after is not None:
+            stmt = stmt.where(tuple_(Transaction.created_at, Transaction.id) > tuple_(*after))
+        if limit is not None:
+            stmt = stmt.order_by(Transaction.created_at, Transaction.id).limit(limit)
+        return stmt
+    
+    merged = union_all(
+        branch(Transaction.from_account_id),
+        branch(Transaction.to_account_id, Transaction.from_account_id.is_distinct_from(account_id)),
+    ).subquery("statement")
+    entry = aliased(Transaction, merged)
+    
+    return select(entry).order_by(entry.created_at, entry.id).limit(limit)
+
+
+@instrument_service
 class TransactionService:
     def __init__(self, session: AsyncSession):
         self.session = session
+    
+    @staticmethod
+    def _fee_rate(from_bank_id: int, to_bank_id: int) -> Decimal:
+        # Here the recipient bears the fee, and only across banks.
+        if from_bank_id == to_bank_id:
+            return Decimal("0")
         
-    async def transfer(self, from_account_id: int, to_account_id: int, amount: Decimal):
-        stmt_from = await self.session.execute(
-            select(Account).
-            where(Account.id == from_account_id)
-        )
-        account_from = stmt_from.scalar_one_or_none()
-        
-        stmt_to = await self.session.execute(
-            select(Account).
-            where(Account.id == to_account_id)
-        )
-        account_to = stmt_to.scalar_one_or_none()
+        return reference_data.fee_rule(from_bank_id).cross_bank_rate
         
+    async def transfer(
+        self,
+        from_account_id: int,
+        to_account_id: int,
+        amount: Decimal,
+        lock_mode: LockMode = LockMode.wait,
+    ):
+        amount = quantize_money(amount)
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
+        accounts = await lock_accounts(
+            self.session,
+            [from_account_id, to_account_id],
+            mode=lock_mode,
+        )
+        account_from = accounts.get(from_account_id)
+        account_to = accounts.get(to_account_id)
+        
+        if account_from is None:
+            raise ValueError(f"Account with id={from_account_id} not found")
+        
+        if account_to is None:
+            raise ValueError(f"Account with id={to_account_id} not found")
+        
         if account_from.balance < amount:
             raise ValueError("Not enough funds")
         
-        is_other_bank = account_from.bank_id != account_to.bank_id
-        
-        fee = (amount * Decimal("0.01")).quantize(Decimal("0.01")) if is_other_bank else Decimal("0.00")
+        await reference_data.ensure_fresh(self.session)
+        fee = quantize_money(amount * self._fee_rate(account_from.bank_id, account_to.bank_id))
         
         account_from.balance -= amount
+        from_balance_after = account_from.balance
         account_to.balance += (amount - fee)
         
+        balances = defaultdict(Decimal)
+        balances[account_from.bank_id] -= amount
+        balances[account_to.bank_id] += amount - fee
+        await bump_bank_balances(self.session, balances)
+        
+        if fee:
+            bank_service = BankService(self.session)
+            await bank_service.add_comission_to_bank(account_from.bank_id, fee, commit=False)
+        
+        # Recorded like ClientService transfers: the sender paid amount + fee,
+        # the recipient got amount.
         transaction = Transaction(
             from_account_id=from_account_id,
             to_account_id=to_account_id,
-            amount=amount,
+            amount=amount - fee,
             fee=fee,
             type=TransactionType.transfer,
         )
         
-        self.session.add(transaction)
+        await record_transaction(self.session, transaction, [
+            (from_account_id, -amount, from_balance_after),
+            (to_account_id, amount - fee, account_to.balance),
+        ])
         await self.session.commit()
         
         return transaction
+
+    async def transfer_many(self, batch: list[TransferItem]) -> list[TransferResult]:
+        await reference_data.ensure_fresh(self.session)
+        
+        def fee_policy(amount: int, from_bank_id: int, to_bank_id: int):
+            fee = apply_rate(amount, self._fee_rate(from_bank_id, to_bank_id))
+            
+            return amount, amount - fee, fee
+        
+        return await apply_transfers(self.session, batch, fee_policy, collect_comission=True)
+
+    async def stream_statement(
+        self,
+        account_id: int,
+        page_size: int = 500,
+        after: tuple[datetime, int] | None = None,
+    ) -> AsyncIterator[StatementPage]:
+        stmt = statement_query(account_id, after).execution_options(yield_per=page_size)
+        
+        result = await self.session.stream_scalars(stmt)
+        
+        async for partition in result.partitions(page_size):
+            last = partition[-1]
+            yield StatementPage(
+                transactions=list(partition),
+                next_cursor=(last.created_at, last.id),
+            )
+            
+            # Drop the page from the identity map so memory stays flat
+            # however long the history is.
+            for transaction in partition:
+                self.session.expunge(transaction)
@@ -0,0 +1,190 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import BigInteger, Integer, any_, bindparam, select, type_coerce, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.money import Money, from_cents, to_cents
+from app.db.bulk import BulkWriter, reserve_ids
+from app.db.models.accounts.models import Account
+from app.db.models.clients.models import Client
+from app.db.models.transactions.models import LedgerEntry, OperationLog, OperationType, Transaction, TransactionType
+
+from app.services.audit import AuditWriter
+from app.services.bank_service import BankService
+from app.services.stats import bump_bank_balances
+
+
+@dataclass
+class TransferItem:
+    from_account_id: int
+    to_account_id: int
+    amount: Decimal
+    client_id: int | None = None
+
+
+@dataclass
+class TransferResult:
+    item: TransferItem
+    fee: Decimal = Decimal("0.00")
+    error: str | None = None
+    # Sender's balance right after this transfer.
+    balance: Decimal | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# (amount, from_bank_id, to_bank_id) -> (debit, credit, fee), all in cents
+FeePolicy = Callable[[int, int, int], tuple[int, int, int]]
+
+
+async def apply_transfers(
+    session: AsyncSession,
+    batch: list[TransferItem],
+    fee_policy: FeePolicy,
+    collect_comission: bool = False,
+    log_operations: bool = False,
+    audit: AuditWriter | None = None,
+) -> list[TransferResult]:
+    account_ids = sorted(
+        {item.from_account_id for item in batch} | {item.to_account_id for item in batch}
+    )
+
+    stmt = await session.execute(
+        select(Account.id, Account.bank_id, type_coerce(Account.balance, BigInteger).label("balance"))
+        .where(Account.id == any_(bindparam("account_ids", account_ids, type_=ARRAY(Integer))))
+        .order_by(Account.id)
+        .with_for_update()
+    )
+    # Balances are handled as integer cents until they are written back.
+    accounts = {row.id: row for row in stmt}
+    balances = {account_id: row.balance for account_id, row in accounts.items()}
+
+    # Operation log rows reference client; one unknown client_id must fail its
+    # own item, not the COPY (and with it the whole batch).
+    client_ids = set()
+    if log_operations:
+        requested = sorted({item.client_id for item in batch if item.client_id is not None})
+        if requested:
+            client_ids = set(await session.scalars(
+                select(Client.id)
+                .where(Client.id == any_(bindparam("client_ids", requested, type_=ARRAY(Integer))))
+            ))
+
+    results = []
+    transactions = []
+    # (index into transactions, account_id, signed amount, balance after)
+    postings = []
+    logs = []
+    comissions = defaultdict(int)
+    bank_balances = defaultdict(int)
+
+    for item in batch:
+        result = TransferResult(item=item)
+        results.append(result)
+
+        from_account = accounts.get(item.from_account_id)
+        to_account = accounts.get(item.to_account_id)
+
+        amount = to_cents(item.amount)
+
+        if amount <= 0:
+            result.error = "Amount must be greater than zero"
+            continue
+        if from_account is None:
+            result.error = f"Account with id={item.from_account_id} not found"
+            continue
+        if to_account is None:
+            result.error = f"Account with id={item.to_account_id} not found"
+            continue
+        if log_operations and item.client_id is not None and item.client_id not in client_ids:
+            result.error = f"Client with id={item.client_id} not found"
+            continue
+
+        debit, credit, fee = fee_policy(amount, from_account.bank_id, to_account.bank_id)
+
+        if debit > balances[item.from_account_id]:
+            result.error = "Not enough money"
+            continue
+
+        balances[item.from_account_id] -= debit
+        result.balance = from_cents(balances[item.from_account_id])
+        postings.append((len(transactions), item.from_account_id, -debit, balances[item.from_account_id]))
+        balances[item.to_account_id] += credit
+        postings.append((len(transactions), item.to_account_id, credit, balances[item.to_account_id]))
+        bank_balances[from_account.bank_id] -= debit
+        bank_balances[to_account.bank_id] += credit
+        result.fee = from_cents(fee)
+
+        if collect_comission and fee:
+            comissions[from_account.bank_id] += fee
+
+        # Every transfer row reads the same way: the sender paid amount + fee
+        # and the recipient got amount, whoever bears the fee.
+        transactions.append({
+            "from_account_id": item.from_account_id,
+            "to_account_id": item.to_account_id,
+            "amount": Money(credit),
+            "fee": Money(debit - credit),
+            "type": TransactionType.transfer,
+        })
+
+        if log_operations and item.client_id is not None:
+            logs.append({
+                "client_id": item.client_id,
+                "action": OperationType.transfer,
+                "data": {
+                    "client_id": item.client_id,
+                    "amount": str(item.amount),
+                },
+            })
+
+    changed = [
+        {"id": account_id, "balance": Money(balance)}
+        for account_id, balance in balances.items()
+        if balance != accounts[account_id].balance
+    ]
+    if changed:
+        await session.execute(update(Account), changed)
+
+    await bump_bank_balances(session, {
+        bank_id: Money(balance) for bank_id, balance in bank_balances.items()
+    })
+
+    bank_service = BankService(session)
+    for bank_id, fee in sorted(comissions.items()):
+        await bank_service.add_comission_to_bank(bank_id, Money(fee), commit=False)
+
+    # Ids are taken up front so ledger postings can reference their
+    # transaction without a RETURNING round trip per row.
+    transaction_ids = await reserve_ids(session, Transaction, len(transactions))
+    for transaction, transaction_id in zip(transactions, transaction_ids):
+        transaction["id"] = transaction_id
+
+    async with BulkWriter(session, Transaction) as writer:
+        await writer.add_many(transactions)
+    async with BulkWriter(session, LedgerEntry) as writer:
+        await writer.add_many([
+            {
+                "transaction_id": transaction_ids[index],
+                "account_id": account_id,
+                "amount": Money(amount),
+                "balance_after": Money(balance_after),
+            }
+            for index, account_id, amount, balance_after in postings
+        ])
+    if audit is None:
+        async with BulkWriter(session, OperationLog) as writer:
+            await writer.add_many(logs)
+
+    await session.commit()
+
+    if audit is not None:
+        await audit.enqueue_committed([(log["client_id"], log["action"], log["data"]) for log in logs])
+
+    return results
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.money import Money
+from app.db.bulk import BulkWriter, reserve_ids
+from app.db.models.accounts.models import Account
+from app.db.models.banks.models import Bank, BankFeeSchedule, BankStats
+from app.db.models.branches.models import Branch
+from app.db.models.clients.models import Client
+from app.db.models.transactions.models import LedgerEntry
+from app.services.reference_data import DEFAULT_FEE_RULE, bump_reference_version, reference_data
+from app.simulation.state import SimulationState, from_rate, to_rate
+
+
+@dataclass
+class ExportResult:
+    # simulation id -> database id, slot 0 unused
+    bank_ids: list[int]
+    client_ids: list[int]
+    account_ids: list[int]
+
+
+async def export_state(session: AsyncSession, state: SimulationState) -> ExportResult:
+    """Persist a simulation as new banks, clients and accounts.
+
+    Ids are reserved from the tables' sequences up front so every row can be
+    COPYed with its final foreign keys. Closed accounts are skipped, as
+    ClientService.close_account deletes them. bank_stats is written from the
+    in-memory aggregates and funded accounts get an opening ledger entry.
+    Everything is committed in one transaction.
+    """
+    bank_ids = [0] + await reserve_ids(session, Bank, state.bank_count)
+    client_ids = [0] + await reserve_ids(session, Client, len(state.client_telegram_ids) - 1)
+    account_ids = [0] + await reserve_ids(session, Account, state.account_count)
+
+    default_rates = (to_rate(DEFAULT_FEE_RULE.same_bank_rate), to_rate(DEFAULT_FEE_RULE.cross_bank_rate))
+    totals, counts = state.bank_totals()
+
+    async with BulkWriter(session, Bank) as writer:
+        for bank_id in range(1, state.bank_count + 1):
+            await writer.add({
+                "id": bank_ids[bank_id],
+                "name": state.bank_names[bank_id],
+                "comission_income": Money(state.bank_comission[bank_id]),
+            })
+
+    async with BulkWriter(session, BankFeeSchedule) as writer:
+        for bank_id in range(1, state.bank_count + 1):
+            rates = (int(state.same_bank_rate[bank_id]), int(state.cross_bank_rate[bank_id]))
+            if rates != default_rates:
+                await writer.add({
+                    "bank_id": bank_ids[bank_id],
+                    "same_bank_rate": from_rate(rates[0]),
+                    "cross_bank_rate": from_rate(rates[1]),
+                })
+
+    async with BulkWriter(session, Branch) as writer:
+        for bank_id in range(1, state.bank_count + 1):
+            for _ in range(state.branch_count[bank_id]):
+                await writer.add({"bank_id": bank_ids[bank_id]})
+
+    async with BulkWriter(session, BankStats) as writer:
+        for bank_id in range(1, state.bank_count + 1):
+            await writer.add({
+                "bank_id": bank_ids[bank_id],
+                "total_balance": Money(totals[bank_id]),
+                "account_count": counts[bank_id],
+                "branch_count": state.branch_count[bank_id],
+            })
+
+    async with BulkWriter(session, Client) as writer:
+        for client_id in range(1, len(state.client_telegram_ids)):
+            await writer.add({
+                "id": client_ids[client_id],
+                "telegram_id": state.client_telegram_ids[client_id],
+            })
+
+    balances = state.balance[:state.account_count + 1].tolist()
+    open_flags = state.account_open[:state.account_count + 1].tolist()
+    account_bank_ids = state.account_bank_id[:state.account_count + 1].tolist()
+    account_client_ids = state.account_client_id[:state.account_count + 1].tolist()
+
+    async with BulkWriter(session, Account) as writer:
+        for account_id in range(1, state.account_count + 1):
+            if not open_flags[account_id]:
+                continue
+            await writer.add({
+                "id": account_ids[account_id],
+                "bank_id": bank_ids[account_bank_ids[account_id]],
+                "client_id": client_ids[account_client_ids[account_id]],
+                "balance": Money(balances[account_id]),
+            })
+
+    async with BulkWriter(session, LedgerEntry) as writer:
+        for account_id in range(1, state.account_count + 1):
+            if not open_flags[account_id] or not balances[account_id]:
+                continue
+            await writer.add({
+                "account_id": account_ids[account_id],
+                "amount": Money(balances[account_id]),
+                "balance_after": Money(balances[account_id]),
+            })
+
+    await bump_reference_version(session)
+    await session.commit()
+
+    reference_data.invalidate()
+
+    return ExportResult(bank_ids=bank_ids, client_ids=client_ids, account_ids=account_ids)
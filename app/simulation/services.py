@@ -0,0 +1,222 @@
+from decimal import Decimal
+
+from app.db.models.accounts.models import Account
+from app.db.models.banks.models import Bank, BankFeeSchedule
+from app.db.models.branches.models import Branch
+from app.db.models.clients.models import Client
+from app.db.models.transactions.models import OperationType
+from app.services.locking import LockMode
+from app.services.transfers import TransferItem, TransferResult
+from app.core.money import from_cents, to_cents
+from app.simulation.state import SimulationState, to_rate
+
+
+class SimulatedBankService:
+    """BankService backed by a SimulationState instead of a session."""
+
+    def __init__(self, state: SimulationState):
+        self.state = state
+
+    async def create_bank(self, name: str) -> Bank:
+        bank_id = self.state.add_bank(name)
+
+        return Bank(id=bank_id, name=name, comission_income=Decimal("0.00"))
+
+    async def get_bank(self, bank_id: int) -> Bank:
+        if not self.state.has_bank(bank_id):
+            return None
+
+        return Bank(
+            id=bank_id,
+            name=self.state.bank_names[bank_id],
+            comission_income=from_cents(self.state.bank_comission[bank_id]),
+        )
+
+    async def set_fee_schedule(
+        self,
+        bank_id: int,
+        same_bank_rate: Decimal,
+        cross_bank_rate: Decimal,
+    ) -> BankFeeSchedule:
+        if same_bank_rate < 0 or cross_bank_rate < 0:
+            raise ValueError("Fee rates must not be negative")
+        if not self.state.has_bank(bank_id):
+            raise ValueError("Bank not found")
+
+        self.state.same_bank_rate[bank_id] = to_rate(same_bank_rate)
+        self.state.cross_bank_rate[bank_id] = to_rate(cross_bank_rate)
+
+        return BankFeeSchedule(
+            bank_id=bank_id,
+            same_bank_rate=same_bank_rate,
+            cross_bank_rate=cross_bank_rate,
+        )
+
+    async def create_branch(self, bank_id: int) -> Branch:
+        if not self.state.has_bank(bank_id):
+            raise ValueError("Bank not found")
+
+        self.state.branch_count[bank_id] += 1
+
+        return Branch(bank_id=bank_id, balance=Decimal("0.00"))
+
+    async def get_total_comission(self, bank_id: int) -> Decimal:
+        if not self.state.has_bank(bank_id):
+            return Decimal("0.00")
+
+        return from_cents(self.state.bank_comission[bank_id])
+
+    async def get_total_client_balance(self, bank_id: int) -> Decimal:
+        totals, _ = self.state.bank_totals()
+
+        return from_cents(totals[bank_id]) if self.state.has_bank(bank_id) else None
+
+    async def get_summary(self, bank_id: int, use_stats: bool = True) -> dict:
+        if not self.state.has_bank(bank_id):
+            raise ValueError(f"Bank with id={bank_id} not found")
+
+        totals, counts = self.state.bank_totals()
+
+        return {
+            "bank_name": self.state.bank_names[bank_id],
+            "client_total_balance": from_cents(totals[bank_id]),
+            "comission_income": from_cents(self.state.bank_comission[bank_id]),
+            "total_accounts": counts[bank_id],
+            "total_branches": self.state.branch_count[bank_id],
+        }
+
+    async def add_comission_to_bank(self, bank_id: int, fee: Decimal, commit: bool = True):
+        if not self.state.has_bank(bank_id):
+            raise ValueError("Bank not found")
+
+        self.state.bank_comission[bank_id] += to_cents(fee)
+
+
+class SimulatedClientService:
+    """ClientService backed by a SimulationState.
+
+    Same method names, arguments and errors as the database service, but
+    every operation is a handful of array reads and writes. Balances come
+    back as Decimal; use SimulationState.apply_tick for bulk runs.
+    """
+
+    def __init__(self, state: SimulationState):
+        self.state = state
+
+    def _replay(self, idempotency_key: str | None, operation: OperationType) -> Decimal | None:
+        if idempotency_key is None or idempotency_key not in self.state.idempotency:
+            return None
+
+        previous_operation, balance = self.state.idempotency[idempotency_key]
+        if previous_operation != operation:
+            raise ValueError(f"Idempotency key {idempotency_key!r} was already used for {previous_operation.value}")
+
+        return from_cents(balance)
+
+    def _remember(self, idempotency_key: str | None, operation: OperationType, balance: int) -> Decimal:
+        if idempotency_key is not None:
+            self.state.idempotency[idempotency_key] = (operation, int(balance))
+
+        return from_cents(balance)
+
+    async def create_client(self, telegram_id: int) -> Client:
+        client_ids = self.state.add_clients([telegram_id])
+
+        return Client(id=client_ids[0], telegram_id=telegram_id)
+
+    async def get_client_by_telegram_id(self, telegram_id: int) -> Client:
+        client_id = self.state.clients.get(telegram_id)
+        if client_id is None:
+            return None
+
+        return Client(id=client_id, telegram_id=telegram_id)
+
+    async def open_account(self, bank_id: int, client_id: int) -> Account:
+        account_ids = self.state.open_accounts([bank_id], [client_id])
+
+        return Account(
+            id=account_ids[0],
+            bank_id=bank_id,
+            client_id=client_id,
+            balance=Decimal("0.00"),
+        )
+
+    async def close_account(self, account_id: int, client_id: int):
+        if not self.state.is_open(account_id):
+            raise ValueError(f"Account with id={account_id} not found")
+        if self.state.balance[account_id] > 0:
+            raise ValueError(f"Account balance must be zero to close it")
+
+        self.state.account_open[account_id] = False
+
+    async def deposit(
+        self,
+        account_id: int,
+        amount: Decimal,
+        client_id,
+        idempotency_key: str | None = None,
+    ) -> Decimal:
+        previous = self._replay(idempotency_key, OperationType.deposit)
+        if previous is not None:
+            return previous
+
+        balance = self.state.credit(account_id, to_cents(amount))
+
+        return self._remember(idempotency_key, OperationType.deposit, balance)
+
+    async def withdraw(
+        self,
+        account_id: int,
+        amount: Decimal,
+        client_id: int,
+        idempotency_key: str | None = None,
+    ) -> Decimal:
+        previous = self._replay(idempotency_key, OperationType.withdraw)
+        if previous is not None:
+            return previous
+
+        balance = self.state.debit(account_id, to_cents(amount), error="Not enough money on balance")
+
+        return self._remember(idempotency_key, OperationType.withdraw, balance)
+
+    async def transfer(
+        self,
+        from_account_id: int,
+        to_account_id: int,
+        amount: Decimal,
+        client_id: int,
+        fee_percent: Decimal | None = None,
+        lock_mode: LockMode = LockMode.wait,
+        idempotency_key: str | None = None,
+    ) -> Decimal:
+        previous = self._replay(idempotency_key, OperationType.transfer)
+        if previous is not None:
+            return previous
+
+        rate = None if fee_percent is None else to_rate(fee_percent)
+        self.state.transfer(from_account_id, to_account_id, to_cents(amount), rate)
+
+        return self._remember(idempotency_key, OperationType.transfer, self.state.balance[from_account_id])
+
+    async def transfer_many(
+        self,
+        batch: list[TransferItem],
+        fee_percent: Decimal | None = None,
+    ) -> list[TransferResult]:
+        rate = None if fee_percent is None else to_rate(fee_percent)
+        results = []
+
+        for item in batch:
+            result = TransferResult(item=item)
+            results.append(result)
+
+            try:
+                fee = self.state.transfer(item.from_account_id, item.to_account_id, to_cents(item.amount), rate)
+            except ValueError as error:
+                result.error = str(error)
+                continue
+
+            result.fee = from_cents(fee)
+            result.balance = from_cents(self.state.balance[item.from_account_id])
+
+        return results
@@ -0,0 +1,348 @@
+from array import array
+from dataclasses import dataclass
+from decimal import ROUND_HALF_EVEN, Decimal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app.services.reference_data import DEFAULT_FEE_RULE
+
+
+# Fee rates are kept as integer parts per million so fees can be computed on
+# whole columns of integer cents.
+RATE_SCALE = 1_000_000
+
+
+def to_rate(rate: Decimal) -> int:
+    return int((Decimal(rate) * RATE_SCALE).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_rate(rate: int) -> Decimal:
+    return Decimal(int(rate)) / RATE_SCALE
+
+
+def fee_cents(amount: int, rate: int) -> int:
+    # Same rounding as Decimal.quantize(Decimal("0.01")) on amount * rate.
+    quotient, remainder = divmod(amount * rate, RATE_SCALE)
+    if 2 * remainder > RATE_SCALE or (2 * remainder == RATE_SCALE and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+@dataclass
+class TickResult:
+    deposits: list | None = None
+    withdrawals: list | None = None
+    transfers: list | None = None
+    fees: list | None = None
+
+
+class SimulationState:
+    """Columnar in-memory copy of banks and accounts.
+
+    Each column is indexed by id (slot 0 is unused), balances are int64
+    cents. Columns are NumPy arrays when NumPy is installed and
+    `array.array` otherwise; whole ticks of operations are applied with
+    vectorized NumPy calls, or with a plain loop with identical results.
+    """
+
+    def __init__(self, capacity: int = 1024, use_numpy: bool | None = None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed")
+
+        self.use_numpy = use_numpy
+
+        self.account_count = 0
+        self.balance = self._column("q", capacity + 1)
+        self.account_bank_id = self._column("l", capacity + 1)
+        self.account_client_id = self._column("l", capacity + 1)
+        self.account_open = self._column("b", capacity + 1)
+
+        self.bank_names: list[str | None] = [None]
+        self.bank_comission = self._column("q", 1)
+        self.same_bank_rate = self._column("q", 1)
+        self.cross_bank_rate = self._column("q", 1)
+        self.branch_count: list[int] = [0]
+
+        self.clients: dict[int, int] = {}
+        self.client_telegram_ids: list[int | None] = [None]
+
+        self.idempotency: dict[str, tuple[str, int]] = {}
+
+    def _column(self, typecode: str, size: int):
+        if self.use_numpy:
+            return np.zeros(size, dtype={"q": np.int64, "l": np.int32, "b": np.bool_}[typecode])
+        return array(typecode, bytes(size * array(typecode).itemsize))
+
+    def _grow(self, column, size: int):
+        if len(column) >= size:
+            return column
+
+        extra = max(size, 2 * len(column)) - len(column)
+        if self.use_numpy:
+            return np.concatenate((column, np.zeros(extra, dtype=column.dtype)))
+        column.extend(array(column.typecode, bytes(extra * column.itemsize)))
+        return column
+
+    @property
+    def bank_count(self) -> int:
+        return len(self.bank_names) - 1
+
+    def add_bank(self, name: str) -> int:
+        if name in self.bank_names:
+            raise ValueError(f"Bank with name={name!r} already exists")
+
+        self.bank_names.append(name)
+        self.branch_count.append(0)
+        bank_id = self.bank_count
+
+        self.bank_comission = self._grow(self.bank_comission, bank_id + 1)
+        self.same_bank_rate = self._grow(self.same_bank_rate, bank_id + 1)
+        self.cross_bank_rate = self._grow(self.cross_bank_rate, bank_id + 1)
+        self.same_bank_rate[bank_id] = to_rate(DEFAULT_FEE_RULE.same_bank_rate)
+        self.cross_bank_rate[bank_id] = to_rate(DEFAULT_FEE_RULE.cross_bank_rate)
+
+        return bank_id
+
+    def has_bank(self, bank_id: int) -> bool:
+        return 1 <= bank_id <= self.bank_count
+
+    def add_clients(self, telegram_ids: list[int]) -> range:
+        first = len(self.client_telegram_ids)
+        for offset, telegram_id in enumerate(telegram_ids):
+            if telegram_id in self.clients:
+                raise ValueError(f"Client with telegram_id={telegram_id} already exists")
+            self.clients[telegram_id] = first + offset
+        self.client_telegram_ids.extend(telegram_ids)
+
+        return range(first, len(self.client_telegram_ids))
+
+    def open_accounts(self, bank_ids, client_ids) -> range:
+        count = len(bank_ids)
+        first = self.account_count + 1
+        last = self.account_count + count
+
+        unique_bank_ids = np.unique(bank_ids).tolist() if self.use_numpy else set(bank_ids)
+        for bank_id in unique_bank_ids:
+            if not self.has_bank(bank_id):
+                raise ValueError(f"Bank with id={bank_id} not found")
+
+        self.balance = self._grow(self.balance, last + 1)
+        self.account_bank_id = self._grow(self.account_bank_id, last + 1)
+        self.account_client_id = self._grow(self.account_client_id, last + 1)
+        self.account_open = self._grow(self.account_open, last + 1)
+
+        if self.use_numpy:
+            self.account_bank_id[first:last + 1] = bank_ids
+            self.account_client_id[first:last + 1] = client_ids
+            self.account_open[first:last + 1] = True
+        else:
+            for offset in range(count):
+                self.account_bank_id[first + offset] = bank_ids[offset]
+                self.account_client_id[first + offset] = client_ids[offset]
+                self.account_open[first + offset] = True
+
+        self.account_count = last
+
+        return range(first, last + 1)
+
+    def is_open(self, account_id: int) -> bool:
+        return 1 <= account_id <= self.account_count and bool(self.account_open[account_id])
+
+    def fee_rate(self, from_bank_id: int, to_bank_id: int) -> int:
+        if from_bank_id == to_bank_id:
+            return int(self.same_bank_rate[from_bank_id])
+        return int(self.cross_bank_rate[from_bank_id])
+
+    # Single operations. Amounts are cents; errors match the database services.
+
+    def credit(self, account_id: int, amount: int) -> int:
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
+        if not self.is_open(account_id):
+            raise ValueError(f"Account with id={account_id} not found")
+
+        self.balance[account_id] += amount
+        return int(self.balance[account_id])
+
+    def debit(self, account_id: int, amount: int, error: str = "Not enough funds") -> int:
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
+        if not self.is_open(account_id):
+            raise ValueError(f"Account with id={account_id} not found")
+        if amount > self.balance[account_id]:
+            raise ValueError(error)
+
+        self.balance[account_id] -= amount
+        return int(self.balance[account_id])
+
+    def transfer(self, from_account_id: int, to_account_id: int, amount: int, rate: int | None = None) -> int:
+        if amount <= 0:
+            raise ValueError("Amount must be greater than zero")
+        if not self.is_open(from_account_id):
+            raise ValueError(f"Account with id={from_account_id} not found")
+        if not self.is_open(to_account_id):
+            raise ValueError(f"Account with id={to_account_id} not found")
+
+        from_bank_id = int(self.account_bank_id[from_account_id])
+        to_bank_id = int(self.account_bank_id[to_account_id])
+        if rate is None or from_bank_id != to_bank_id:
+            rate = self.fee_rate(from_bank_id, to_bank_id)
+
+        fee = fee_cents(amount, rate)
+        if amount + fee > self.balance[from_account_id]:
+            raise ValueError("Not enough money")
+
+        self.balance[from_account_id] -= amount + fee
+        self.balance[to_account_id] += amount
+        self.bank_comission[from_bank_id] += fee
+
+        return fee
+
+    # Whole ticks.
+
+    def apply_tick(self, deposits=None, withdrawals=None, transfers=None) -> TickResult:
+        """Apply one tick of operations given as parallel columns.
+
+        deposits and withdrawals are (account_ids, amounts), transfers are
+        (from_account_ids, to_account_ids, amounts), all in cents. Deposits
+        settle first, then withdrawals, then transfers. Within a phase each
+        account's debits are accepted in order for as long as its balance at
+        the start of the phase covers them; incoming transfers only become
+        spendable in the next tick. Returns accepted masks and transfer fees.
+        """
+        result = TickResult()
+        tick = self._numpy_tick if self.use_numpy else self._python_tick
+
+        if deposits is not None:
+            result.deposits = tick("deposit", *deposits)
+        if withdrawals is not None:
+            result.withdrawals = tick("withdraw", *withdrawals)
+        if transfers is not None:
+            result.transfers, result.fees = tick("transfer", *transfers)
+
+        return result
+
+    def _python_tick(self, kind: str, *columns):
+        if kind == "transfer":
+            from_ids, to_ids, amounts = columns
+        else:
+            from_ids, amounts = columns
+            to_ids = from_ids
+
+        accepted = []
+        fees = []
+        running: dict[int, int] = {}
+
+        for from_id, to_id, amount in zip(from_ids, to_ids, amounts):
+            fee = 0
+            ok = amount > 0 and self.is_open(from_id) and self.is_open(to_id)
+
+            if ok and kind == "transfer":
+                fee = fee_cents(amount, self.fee_rate(self.account_bank_id[from_id], self.account_bank_id[to_id]))
+            if ok and kind != "deposit":
+                # Rejected debits still count, so an account stops at its
+                # first overdraft exactly as in the NumPy path.
+                running[from_id] = running.get(from_id, 0) + amount + fee
+                ok = running[from_id] <= self.balance[from_id]
+
+            accepted.append(ok)
+            fees.append(fee if ok else 0)
+
+        for from_id, to_id, amount, fee, ok in zip(from_ids, to_ids, amounts, fees, accepted):
+            if not ok:
+                continue
+            if kind != "deposit":
+                self.balance[from_id] -= amount + fee
+            if kind != "withdraw":
+                self.balance[to_id] += amount
+            if fee:
+                self.bank_comission[self.account_bank_id[from_id]] += fee
+
+        if kind == "transfer":
+            return accepted, fees
+        return accepted
+
+    def _numpy_tick(self, kind: str, *columns):
+        if kind == "transfer":
+            from_ids, to_ids, amounts = (np.asarray(column, dtype=np.int64) for column in columns)
+        else:
+            from_ids, amounts = (np.asarray(column, dtype=np.int64) for column in columns)
+            to_ids = from_ids
+
+        n = self.account_count
+        in_range = (from_ids >= 1) & (from_ids <= n) & (to_ids >= 1) & (to_ids <= n)
+        from_slots = np.where(in_range, from_ids, 0)
+        to_slots = np.where(in_range, to_ids, 0)
+        valid = in_range & (amounts > 0) & self.account_open[from_slots] & self.account_open[to_slots]
+
+        if kind == "deposit":
+            np.add.at(self.balance, to_slots[valid], amounts[valid])
+            return valid
+
+        fees = np.zeros_like(amounts)
+        if kind == "transfer":
+            from_banks = self.account_bank_id[from_slots]
+            rates = np.where(
+                from_banks == self.account_bank_id[to_slots],
+                self.same_bank_rate[from_banks],
+                self.cross_bank_rate[from_banks],
+            )
+            quotient, remainder = np.divmod(amounts * rates, RATE_SCALE)
+            fees = quotient + ((2 * remainder > RATE_SCALE) | ((2 * remainder == RATE_SCALE) & (quotient % 2 == 1)))
+
+        # Running debit per account in submission order: stable sort by
+        # account, cumulative sum, then subtract the sum before each group.
+        debits = np.where(valid, amounts + fees, 0)
+        order = np.argsort(from_slots, kind="stable")
+        sorted_ids = from_slots[order]
+        running = np.cumsum(debits[order])
+        group_start = np.ones(len(order), dtype=np.bool_)
+        group_start[1:] = sorted_ids[1:] != sorted_ids[:-1]
+        before_group = np.maximum.accumulate(np.where(group_start, running - debits[order], 0))
+        covered = np.empty(len(order), dtype=np.bool_)
+        covered[order] = running - before_group <= self.balance[sorted_ids]
+
+        accepted = valid & covered
+        np.subtract.at(self.balance, from_slots[accepted], debits[accepted])
+
+        if kind == "withdraw":
+            return accepted
+
+        np.add.at(self.balance, to_slots[accepted], amounts[accepted])
+        np.add.at(self.bank_comission, self.account_bank_id[from_slots[accepted]], fees[accepted])
+
+        return accepted, np.where(accepted, fees, 0)
+
+    # Aggregates.
+
+    def bank_totals(self) -> tuple[list[int], list[int]]:
+        """Open-account balance and count per bank id."""
+        banks = self.bank_count + 1
+        if self.use_numpy:
+            n = self.account_count + 1
+            open_mask = self.account_open[:n]
+            bank_ids = self.account_bank_id[:n][open_mask]
+            balances = self.balance[:n][open_mask]
+            totals = np.zeros(banks, dtype=np.int64)
+            np.add.at(totals, bank_ids, balances)
+            return totals.tolist(), np.bincount(bank_ids, minlength=banks).tolist()
+
+        totals = [0] * banks
+        counts = [0] * banks
+        for account_id in range(1, self.account_count + 1):
+            if self.account_open[account_id]:
+                bank_id = self.account_bank_id[account_id]
+                totals[bank_id] += self.balance[account_id]
+                counts[bank_id] += 1
+        return totals, counts
+
+    def total_money(self) -> int:
+        if self.use_numpy:
+            n = self.account_count + 1
+            return int(self.balance[:n].sum()) + int(self.bank_comission.sum())
+        return sum(self.balance) + sum(self.bank_comission)
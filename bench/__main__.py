@@ -0,0 +1,86 @@
+"""Service-layer load generator.
+
+Seeds banks, branches, clients and accounts through BankService and
+ClientService, drives one workload at a fixed concurrency and prints a JSON
+report with throughput, latency percentiles and invariant checks:
+
+    python -m bench --workload transfer --concurrency 64 --operations 20000 --skew 1.2
+"""
+import argparse
+import asyncio
+import json
+from decimal import Decimal
+
+from app.core.metrics import dump_metrics
+from app.db.database import async_session_maker, dispose_engines
+from app.services.coordinator import TransferCoordinator
+from bench.harness import WORKLOADS, build_report, check_invariants, run_workload, seed
+
+
+async def main(args: argparse.Namespace) -> dict:
+    dataset = await seed(
+        banks=args.banks,
+        branches_per_bank=args.branches,
+        clients=args.clients,
+        accounts_per_client=args.accounts_per_client,
+        initial_balance=args.initial_balance,
+        concurrency=args.concurrency,
+    )
+
+    coordinator = None
+    if args.group_commit:
+        coordinator = TransferCoordinator(
+            async_session_maker,
+            max_batch=args.batch_size,
+            max_wait=args.batch_window_ms / 1000,
+        )
+        coordinator.start()
+
+    stats, elapsed = await run_workload(
+        dataset,
+        workload=args.workload,
+        operations=args.operations,
+        concurrency=args.concurrency,
+        skew=args.skew,
+        amount=args.amount,
+        transfer=coordinator.transfer if coordinator is not None else None,
+    )
+
+    if coordinator is not None:
+        await coordinator.stop()
+
+    invariants = await check_invariants(dataset, stats)
+    await dispose_engines()
+
+    if args.metrics:
+        dump_metrics(args.metrics)
+
+    return build_report(args.workload, args.concurrency, stats, elapsed, invariants)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="transfer")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--operations", type=int, default=10_000)
+    parser.add_argument("--banks", type=int, default=5)
+    parser.add_argument("--branches", type=int, default=2, help="branches per bank")
+    parser.add_argument("--clients", type=int, default=1_000)
+    parser.add_argument("--accounts-per-client", type=int, default=1)
+    parser.add_argument("--initial-balance", type=Decimal, default=Decimal("1000.00"))
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1.00"))
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for account selection, 0 = uniform")
+    parser.add_argument("--group-commit", action="store_true", help="send transfers through a TransferCoordinator")
+    parser.add_argument("--batch-size", type=int, default=256, help="group commit: max transfers per transaction")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="group commit: max wait after the first transfer")
+    parser.add_argument("--output", help="write the report to this file instead of stdout")
+    parser.add_argument("--metrics", help="dump per-method service histograms in Prometheus text format to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        print(report)
@@ -0,0 +1,75 @@
+"""Concurrency check for the single-statement balance updates.
+
+Fires deposits and withdrawals at one account from many sessions at once and
+verifies that the final balance equals the expected one, i.e. no update was
+lost. Run against a scratch database:
+
+    python -m bench.concurrent_balance_updates --workers 64 --ops 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from decimal import Decimal
+
+from app.db.database import async_session_maker
+from app.services.account_service import AccountService
+from app.services.bank_service import BankService
+from app.services.client_service import ClientService
+
+
+async def worker(account_id: int, ops: int, amount: Decimal, counters: dict):
+    for _ in range(ops):
+        async with async_session_maker() as session:
+            service = AccountService(session)
+            if random.random() < 0.5:
+                await service.deposit(account_id, amount)
+                counters["deposited"] += amount
+            else:
+                try:
+                    await service.withdraw(account_id, amount)
+                    counters["withdrawn"] += amount
+                except ValueError:
+                    counters["rejected"] += 1
+
+
+async def main(workers: int, ops: int, amount: Decimal, initial: Decimal):
+    async with async_session_maker() as session:
+        bank = await BankService(session).create_bank(name=f"bench-{time.time_ns()}")
+        client = await ClientService(session).create_client(telegram_id=random.randint(1, 2**31 - 1))
+        account = await AccountService(session).create_account(bank_id=bank.id, client_id=client.id)
+        await AccountService(session).deposit(account.id, initial)
+
+    counters = {"deposited": Decimal("0.00"), "withdrawn": Decimal("0.00"), "rejected": 0}
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(account.id, ops, amount, counters) for _ in range(workers)))
+    elapsed = time.perf_counter() - started
+
+    async with async_session_maker() as session:
+        accounts = await AccountService(session).get_accounts(client_id=client.id)
+        final = accounts[0].balance
+
+    expected = initial + counters["deposited"] - counters["withdrawn"]
+
+    print(json.dumps({
+        "operations": workers * ops,
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round(workers * ops / elapsed, 1),
+        "rejected_withdrawals": counters["rejected"],
+        "expected_balance": str(expected),
+        "final_balance": str(final),
+        "lost_updates": final != expected,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=100)
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1.00"))
+    parser.add_argument("--initial", type=Decimal, default=Decimal("100.00"))
+    args = parser.parse_args()
+
+    asyncio.run(main(args.workers, args.ops, args.amount, args.initial))
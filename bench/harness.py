@@ -0,0 +1,249 @@
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Awaitable, Callable
+
+from sqlalchemy import func, select
+
+from app.db.database import async_session_maker
+from app.db.models.accounts.models import Account
+from app.db.models.banks.models import BankStats
+from app.services.bank_service import BankService
+from app.services.client_service import ClientService
+
+
+WORKLOADS = {
+    # operation -> share of the mix
+    "deposit": {"deposit": 0.8, "withdraw": 0.2},
+    "transfer": {"transfer": 0.9, "deposit": 0.1},
+    "summary": {"summary": 0.9, "deposit": 0.1},
+}
+
+
+@dataclass
+class Dataset:
+    bank_ids: list[int]
+    accounts: list[tuple[int, int]]  # (account_id, client_id)
+    initial_total: Decimal
+    account_banks: dict[int, int] = field(default_factory=dict)
+
+
+# (from_account_id, to_account_id, amount, client_id)
+TransferFunc = Callable[[int, int, Decimal, int], Awaitable]
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    rejected: int = 0
+    errors: int = 0
+    deposited: Decimal = Decimal("0.00")
+    withdrawn: Decimal = Decimal("0.00")
+
+    def record(self, operation: str, seconds: float):
+        self.latencies.setdefault(operation, []).append(seconds)
+
+    def merge(self, other: "Stats"):
+        for operation, values in other.latencies.items():
+            self.latencies.setdefault(operation, []).extend(values)
+        self.rejected += other.rejected
+        self.errors += other.errors
+        self.deposited += other.deposited
+        self.withdrawn += other.withdrawn
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def latency_summary(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(max(values, default=0.0) * 1000, 3),
+    }
+
+
+def zipf_weights(n: int, skew: float) -> list[float]:
+    return list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+
+
+async def seed(
+    banks: int,
+    branches_per_bank: int,
+    clients: int,
+    accounts_per_client: int,
+    initial_balance: Decimal,
+    concurrency: int,
+) -> Dataset:
+    run_id = time.time_ns()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with async_session_maker() as session:
+        bank_service = BankService(session)
+        bank_ids = []
+        for index in range(banks):
+            bank = await bank_service.create_bank(name=f"bench-{run_id}-{index}")
+            bank_ids.append(bank.id)
+            for _ in range(branches_per_bank):
+                await bank_service.create_branch(bank.id)
+
+    account_banks = {}
+
+    async def seed_client(index: int) -> list[tuple[int, int]]:
+        async with semaphore, async_session_maker() as session:
+            service = ClientService(session)
+            client = await service.create_client(telegram_id=(run_id + index) % 2**31)
+            opened = []
+            for _ in range(accounts_per_client):
+                account = await service.open_account(bank_id=random.choice(bank_ids), client_id=client.id)
+                if initial_balance:
+                    await service.deposit(account.id, initial_balance, client.id)
+                opened.append((account.id, client.id))
+                account_banks[account.id] = account.bank_id
+            return opened
+
+    seeded = await asyncio.gather(*(seed_client(index) for index in range(clients)))
+    accounts = [account for opened in seeded for account in opened]
+
+    return Dataset(
+        bank_ids=bank_ids,
+        accounts=accounts,
+        initial_total=initial_balance * len(accounts),
+        account_banks=account_banks,
+    )
+
+
+async def run_workload(
+    dataset: Dataset,
+    workload: str,
+    operations: int,
+    concurrency: int,
+    skew: float,
+    amount: Decimal,
+    transfer: TransferFunc | None = None,
+) -> tuple[Stats, float]:
+    mix = WORKLOADS[workload]
+    names, shares = list(mix), list(mix.values())
+    cum_weights = zipf_weights(len(dataset.accounts), skew)
+    remaining = itertools.count()
+    stats = Stats()
+
+    def pick_account() -> tuple[int, int]:
+        return random.choices(dataset.accounts, cum_weights=cum_weights)[0]
+
+    async def run_one(operation: str):
+        async with async_session_maker() as session:
+            if operation == "summary":
+                await BankService(session).get_summary(random.choice(dataset.bank_ids))
+                return
+
+            service = ClientService(session)
+            account_id, client_id = pick_account()
+
+            if operation == "deposit":
+                await service.deposit(account_id, amount, client_id)
+                stats.deposited += amount
+            elif operation == "withdraw":
+                await service.withdraw(account_id, amount, client_id)
+                stats.withdrawn += amount
+            elif operation == "transfer":
+                to_account_id, _ = pick_account()
+                if to_account_id == account_id:
+                    return
+                if transfer is None:
+                    await service.transfer(account_id, to_account_id, amount, client_id)
+                else:
+                    await transfer(account_id, to_account_id, amount, client_id)
+
+    async def worker():
+        while next(remaining) < operations:
+            operation = random.choices(names, weights=shares)[0]
+            started = time.perf_counter()
+            try:
+                await run_one(operation)
+            except ValueError:
+                stats.rejected += 1
+            except Exception:
+                stats.errors += 1
+            stats.record(operation, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return stats, time.perf_counter() - started
+
+
+async def check_invariants(dataset: Dataset, stats: Stats) -> dict:
+    account_ids = [account_id for account_id, _ in dataset.accounts]
+
+    async with async_session_maker() as session:
+        bank_service = BankService(session)
+
+        total_balance = await session.scalar(
+            select(func.coalesce(func.sum(Account.balance), 0))
+            .where(Account.id.in_(account_ids))
+        )
+        total_comission = Decimal("0.00")
+        for bank_id in dataset.bank_ids:
+            total_comission += await bank_service.get_total_comission(bank_id)
+
+        live = await session.execute(
+            select(Account.bank_id, func.sum(Account.balance), func.count(Account.id))
+            .where(Account.bank_id.in_(dataset.bank_ids))
+            .group_by(Account.bank_id)
+        )
+        cached = await session.execute(
+            select(BankStats.bank_id, func.sum(BankStats.total_balance), func.sum(BankStats.account_count))
+            .where(BankStats.bank_id.in_(dataset.bank_ids))
+            .group_by(BankStats.bank_id)
+        )
+
+    live = {bank_id: (balance, count) for bank_id, balance, count in live}
+    cached = {bank_id: (balance, count) for bank_id, balance, count in cached}
+    stats_drift = {
+        bank_id: {"live": [str(value) for value in live[bank_id]], "bank_stats": [str(value) for value in cached.get(bank_id, ())]}
+        for bank_id in live
+        if live[bank_id] != cached.get(bank_id)
+    }
+
+    # Transfers only move money between accounts and into comission income,
+    # so balances plus comission must equal what was put in minus taken out.
+    expected = dataset.initial_total + stats.deposited - stats.withdrawn
+
+    return {
+        "expected_total": str(expected),
+        "balances_plus_comission": str(total_balance + total_comission),
+        "money_conserved": total_balance + total_comission == expected,
+        "bank_stats_drift": stats_drift,
+    }
+
+
+def build_report(workload: str, concurrency: int, stats: Stats, elapsed: float, invariants: dict) -> dict:
+    completed = sum(len(values) for values in stats.latencies.values())
+    all_latencies = [value for values in stats.latencies.values() for value in values]
+
+    return {
+        "workload": workload,
+        "concurrency": concurrency,
+        "operations": completed,
+        "seconds": round(elapsed, 3),
+        "throughput_ops": round(completed / elapsed, 1) if elapsed else 0.0,
+        "latency": latency_summary(all_latencies),
+        "latency_by_operation": {
+            operation: latency_summary(values)
+            for operation, values in stats.latencies.items()
+        },
+        "rejected": stats.rejected,
+        "errors": stats.errors,
+        "invariants": invariants,
+    }
@@ -0,0 +1,271 @@
+"""Sharded multi-process load generator.
+
+Seeds a dataset like `python -m bench`, splits its accounts into --workers
+shards by bank or by account id range and runs each shard's ClientService
+workload in its own process with its own engine, so throughput is no
+longer capped by one event loop:
+
+    python -m bench.parallel --workers 8 --shard-by bank --operations 200000 --cross-shard 0.1
+
+A transfer whose destination lives in another shard is split at the shard
+boundary: the source shard withdraws the amount and puts a handoff on the
+destination shard's queue, and the destination shard deposits it. Both
+halves carry an idempotency key derived from the handoff id. Cross-shard
+handoffs pay no transfer fee; all other transfers go through
+ClientService.transfer unchanged.
+
+Per-shard stats and service histograms are merged into one report at the
+end; the invariant check runs once every handoff has been applied.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from app.core import metrics
+from app.db.database import async_session_maker, dispose_engines
+from app.services.client_service import ClientService
+from bench.harness import (
+    WORKLOADS,
+    Dataset,
+    Stats,
+    build_report,
+    check_invariants,
+    latency_summary,
+    run_workload,
+    seed,
+)
+
+
+@dataclass
+class ShardSpec:
+    index: int
+    shards: list[list[tuple[int, int]]]  # (account_id, client_id) per shard
+    bank_ids: list[int]
+    inboxes: list  # one multiprocessing queue per shard
+    workload: str
+    operations: int
+    concurrency: int
+    skew: float
+    amount: Decimal
+    cross_shard: float
+
+
+@dataclass
+class ShardResult:
+    index: int
+    accounts: int
+    stats: Stats
+    elapsed: float
+    handoffs_out: int = 0
+    handoffs_in: int = 0
+    handoff_errors: int = 0
+    histograms: dict = field(default_factory=dict)
+
+
+def partition(dataset: Dataset, workers: int, shard_by: str) -> list[list[tuple[int, int]]]:
+    shards = [[] for _ in range(workers)]
+
+    if shard_by == "bank":
+        # Whole banks per shard, so bank-level locks never cross processes.
+        owner = {bank_id: index % workers for index, bank_id in enumerate(dataset.bank_ids)}
+        for account in dataset.accounts:
+            shards[owner[dataset.account_banks[account[0]]]].append(account)
+    else:
+        accounts = sorted(dataset.accounts)
+        size = -(-len(accounts) // workers)
+        for index in range(workers):
+            shards[index] = accounts[index * size:(index + 1) * size]
+
+    return [shard for shard in shards if shard]
+
+
+async def _run_shard(spec: ShardSpec) -> ShardResult:
+    loop = asyncio.get_running_loop()
+    result = ShardResult(index=spec.index, accounts=len(spec.shards[spec.index]), stats=Stats(), elapsed=0.0)
+    remote = [index for index in range(len(spec.shards)) if index != spec.index]
+
+    async def transfer(from_account_id: int, to_account_id: int, amount: Decimal, client_id: int):
+        if not remote or random.random() >= spec.cross_shard:
+            async with async_session_maker() as session:
+                return await ClientService(session).transfer(from_account_id, to_account_id, amount, client_id)
+
+        target = random.choice(remote)
+        to_account_id, to_client_id = random.choice(spec.shards[target])
+        handoff_id = uuid.uuid4().hex
+
+        async with async_session_maker() as session:
+            balance = await ClientService(session).withdraw(
+                from_account_id, amount, client_id, idempotency_key=f"handoff:{handoff_id}:out"
+            )
+
+        await loop.run_in_executor(None, spec.inboxes[target].put, (handoff_id, to_account_id, amount, to_client_id))
+        result.handoffs_out += 1
+
+        return balance
+
+    async def apply_handoff(semaphore: asyncio.Semaphore, message: tuple):
+        handoff_id, account_id, amount, client_id = message
+        try:
+            async with async_session_maker() as session:
+                await ClientService(session).deposit(
+                    account_id, amount, client_id, idempotency_key=f"handoff:{handoff_id}:in"
+                )
+            result.handoffs_in += 1
+        except Exception:
+            result.handoff_errors += 1
+        finally:
+            semaphore.release()
+
+    async def consume():
+        # Every other shard sends None once it stops producing; queues keep
+        # each producer's order, so after the last None the inbox is drained.
+        inbox = spec.inboxes[spec.index]
+        producers = len(remote)
+        semaphore = asyncio.Semaphore(spec.concurrency)
+        pending = set()
+
+        while producers:
+            message = await loop.run_in_executor(None, inbox.get)
+            if message is None:
+                producers -= 1
+                continue
+
+            await semaphore.acquire()
+            task = asyncio.create_task(apply_handoff(semaphore, message))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        await asyncio.gather(*pending)
+
+    consumer = asyncio.create_task(consume())
+
+    shard = Dataset(bank_ids=spec.bank_ids, accounts=spec.shards[spec.index], initial_total=Decimal("0.00"))
+    result.stats, result.elapsed = await run_workload(
+        shard,
+        workload=spec.workload,
+        operations=spec.operations,
+        concurrency=spec.concurrency,
+        skew=spec.skew,
+        amount=spec.amount,
+        transfer=transfer,
+    )
+
+    for index in remote:
+        await loop.run_in_executor(None, spec.inboxes[index].put, None)
+    await consumer
+
+    await dispose_engines()
+    result.histograms = metrics.snapshot()
+
+    return result
+
+
+def run_shard(spec: ShardSpec) -> ShardResult:
+    # Runs in a fresh spawned process, which imports app.db.database anew
+    # and so gets its own engine and pool.
+    return asyncio.run(_run_shard(spec))
+
+
+async def main(args: argparse.Namespace) -> dict:
+    dataset = await seed(
+        banks=args.banks,
+        branches_per_bank=args.branches,
+        clients=args.clients,
+        accounts_per_client=args.accounts_per_client,
+        initial_balance=args.initial_balance,
+        concurrency=args.concurrency,
+    )
+    await dispose_engines()
+
+    shards = partition(dataset, args.workers, args.shard_by)
+    context = multiprocessing.get_context("spawn")
+    loop = asyncio.get_running_loop()
+
+    with context.Manager() as manager:
+        inboxes = [manager.Queue() for _ in shards]
+        specs = [
+            ShardSpec(
+                index=index,
+                shards=shards,
+                bank_ids=dataset.bank_ids,
+                inboxes=inboxes,
+                workload=args.workload,
+                operations=args.operations // len(shards) + (index < args.operations % len(shards)),
+                concurrency=args.concurrency,
+                skew=args.skew,
+                amount=args.amount,
+                cross_shard=args.cross_shard,
+            )
+            for index in range(len(shards))
+        ]
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            results = await asyncio.gather(*(loop.run_in_executor(pool, run_shard, spec) for spec in specs))
+        wall = time.perf_counter() - started
+
+    stats = Stats()
+    for result in results:
+        stats.merge(result.stats)
+        metrics.merge_snapshot(result.histograms)
+
+    invariants = await check_invariants(dataset, stats)
+    await dispose_engines()
+
+    if args.metrics:
+        metrics.dump_metrics(args.metrics)
+
+    # Shards run side by side; the slowest one sets the pace.
+    report = build_report(args.workload, args.concurrency * len(shards), stats, max(result.elapsed for result in results), invariants)
+    report["workers"] = len(shards)
+    report["shard_by"] = args.shard_by
+    report["wall_seconds"] = round(wall, 3)
+    report["handoff_errors"] = sum(result.handoff_errors for result in results)
+    report["shards"] = [
+        {
+            "index": result.index,
+            "accounts": result.accounts,
+            "seconds": round(result.elapsed, 3),
+            "handoffs_out": result.handoffs_out,
+            "handoffs_in": result.handoffs_in,
+            "latency": latency_summary([value for values in result.stats.latencies.values() for value in values]),
+        }
+        for result in results
+    ]
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--shard-by", choices=["bank", "range"], default="bank")
+    parser.add_argument("--cross-shard", type=float, default=0.1, help="share of transfers sent to another shard")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="transfer")
+    parser.add_argument("--concurrency", type=int, default=16, help="per worker")
+    parser.add_argument("--operations", type=int, default=100_000, help="total across workers")
+    parser.add_argument("--banks", type=int, default=16)
+    parser.add_argument("--branches", type=int, default=2, help="branches per bank")
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--accounts-per-client", type=int, default=1)
+    parser.add_argument("--initial-balance", type=Decimal, default=Decimal("1000.00"))
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1.00"))
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for account selection, 0 = uniform")
+    parser.add_argument("--output", help="write the report to this file instead of stdout")
+    parser.add_argument("--metrics", help="dump merged per-method service histograms in Prometheus text format to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        print(report)
@@ -0,0 +1,144 @@
+"""Query-plan check for the service access paths.
+
+Seeds a dataset inside a transaction, runs EXPLAIN on the statements the
+services issue and fails if any of them is planned without an index or
+with a sequential scan over one of the large tables. The
+transaction is rolled back at the end, so the database is left untouched:
+
+    python -m bench.query_plans
+"""
+import asyncio
+import json
+import sys
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.db.database import engine
+from app.db.models.accounts.models import Account
+from app.db.models.branches.models import Branch
+from app.db.models.transactions.models import OperationLog, Transaction
+from app.services.bank_service import summary_query
+from app.services.locking import LockMode, lock_accounts_query
+from app.services.transaction_service import statement_query
+
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# An index lookup elsewhere in the plan does not excuse a Seq Scan on these.
+LARGE_TABLES = {"account", "transaction", "branch", "operation_log"}
+
+SEED = [
+    "INSERT INTO bank (name, comission_income) "
+    "SELECT 'plan-bank-' || g, 0 FROM generate_series(1, 2000) AS g",
+    "INSERT INTO bank_stats (bank_id, shard, total_balance, account_count, branch_count) "
+    "SELECT id, shard, 0, 0, 0 FROM bank, generate_series(0, 15) AS shard "
+    "ON CONFLICT DO NOTHING",
+    "INSERT INTO bank_commission_shard (bank_id, shard, amount) "
+    "SELECT id, shard, 0 FROM bank, generate_series(0, 15) AS shard "
+    "ON CONFLICT DO NOTHING",
+    "INSERT INTO client (telegram_id) "
+    "SELECT 1000000000 + g FROM generate_series(1, 20000) AS g",
+    "INSERT INTO branch (bank_id, balance) "
+    "SELECT (SELECT min(id) FROM bank) + g % 2000, 0 FROM generate_series(1, 5000) AS g",
+    "INSERT INTO account (bank_id, client_id, balance, created_at, closed_at) "
+    "SELECT (SELECT min(id) FROM bank) + g % 2000, (SELECT min(id) FROM client) + g % 20000, g % 1000, now(), "
+    "CASE WHEN g % 10 = 0 THEN now() END "
+    "FROM generate_series(1, 100000) AS g",
+    "INSERT INTO transaction (from_account_id, to_account_id, amount, fee, type, created_at) "
+    "SELECT (SELECT min(id) FROM account) + g % 100000, (SELECT min(id) FROM account) + (g * 7) % 100000, "
+    "1, 0, 'transfer', now() - (g || ' seconds')::interval "
+    "FROM generate_series(1, 200000) AS g",
+    "INSERT INTO operation_log (client_id, action, timestampe, data) "
+    "SELECT (SELECT min(id) FROM client) + g % 20000, 'deposit', now(), '{}' "
+    "FROM generate_series(1, 100000) AS g",
+    "ANALYZE bank, bank_stats, bank_commission_shard, client, branch, account, transaction, operation_log",
+]
+
+
+def probe_queries(account_id: int, client_id: int, bank_id: int, cursor: tuple) -> dict:
+    # Statements the services build themselves come from the same builders,
+    # so a change to a service query is what gets checked here.
+    return {
+        "BankService.get_summary": summary_query(bank_id),
+        "BankService.get_summary (live)": summary_query(bank_id, use_stats=False),
+        "lock_accounts": lock_accounts_query([account_id - 1, account_id], LockMode.wait),
+        "TransactionService.stream_statement": statement_query(account_id),
+        "TransactionService.stream_statement (resumed)": statement_query(account_id, after=cursor),
+        "statement page": statement_query(account_id, after=cursor, limit=500),
+        "AccountService.get_accounts": select(Account).where(Account.client_id == client_id),
+        "BankService.get_total_client_balance": select(func.sum(Account.balance)).where(Account.bank_id == bank_id),
+        "open accounts of a bank": select(func.sum(Account.balance)).where(
+            Account.bank_id == bank_id,
+            Account.closed_at.is_(None),
+        ),
+        "BankService.get_branches": select(Branch).where(Branch.bank_id == bank_id),
+        "recent transactions": select(Transaction).where(
+            Transaction.created_at >= func.now() - text("interval '1 minute'")
+        ),
+        "operation log of a client": select(OperationLog).where(OperationLog.client_id == client_id),
+    }
+
+
+def plan_nodes(plan: dict):
+    yield plan["Node Type"], plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def large_table(relation: str | None) -> str | None:
+    # Partitions of transaction show up under their own names.
+    if relation is not None and relation.startswith("transaction_"):
+        relation = "transaction"
+    return relation if relation in LARGE_TABLES else None
+
+
+async def main() -> int:
+    report = {}
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            for statement in SEED:
+                await connection.execute(text(statement))
+
+            account_id = (await connection.execute(text("SELECT max(id) FROM account"))).scalar_one()
+            client_id = (await connection.execute(text("SELECT max(id) FROM client"))).scalar_one()
+            bank_id = (await connection.execute(text("SELECT max(id) FROM bank"))).scalar_one()
+            cursor = tuple((await connection.execute(
+                select(Transaction.created_at, Transaction.id)
+                .where(Transaction.from_account_id == account_id)
+                .order_by(Transaction.created_at, Transaction.id)
+                .limit(1)
+            )).one())
+
+            for name, stmt in probe_queries(account_id, client_id, bank_id, cursor).items():
+                sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+                result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+
+                nodes = list(plan_nodes(plan[0]["Plan"]))
+                seq_scans = sorted({
+                    large_table(relation)
+                    for node, relation in nodes
+                    if node == "Seq Scan" and large_table(relation)
+                })
+                report[name] = {
+                    "nodes": [node for node, _ in nodes],
+                    "seq_scans": seq_scans,
+                    "uses_index": any(node in INDEX_NODES for node, _ in nodes),
+                }
+        finally:
+            await transaction.rollback()
+
+    await engine.dispose()
+
+    print(json.dumps(report, indent=2))
+
+    return 0 if all(entry["uses_index"] and not entry["seq_scans"] for entry in report.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,126 @@
+"""In-memory Monte Carlo run on the simulation backend.
+
+Opens --accounts accounts spread over --banks banks, then applies --ticks
+ticks of random deposits, withdrawals and transfers with
+SimulationState.apply_tick and prints a JSON report. --export writes the
+final state to the database:
+
+    python -m bench.simulation --accounts 1000000 --ticks 100 --ops-per-tick 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app.simulation.state import SimulationState, np
+
+
+def random_columns(rng, count: int, accounts: int, max_amount: int):
+    if np is not None and isinstance(rng, np.random.Generator):
+        return (
+            rng.integers(1, accounts + 1, count),
+            rng.integers(1, accounts + 1, count),
+            rng.integers(1, max_amount + 1, count),
+        )
+    return (
+        [rng.randint(1, accounts) for _ in range(count)],
+        [rng.randint(1, accounts) for _ in range(count)],
+        [rng.randint(1, max_amount) for _ in range(count)],
+    )
+
+
+def accepted_total(amounts, accepted) -> int:
+    if np is not None and isinstance(accepted, np.ndarray):
+        return int(amounts[accepted].sum())
+    return sum(amount for amount, ok in zip(amounts, accepted) if ok)
+
+
+def run(args: argparse.Namespace) -> tuple[SimulationState, dict]:
+    state = SimulationState(capacity=args.accounts, use_numpy=not args.no_numpy)
+    rng = np.random.default_rng(args.seed) if state.use_numpy else random.Random(args.seed)
+
+    started = time.perf_counter()
+
+    for index in range(args.banks):
+        state.add_bank(f"sim-{args.seed}-{index}")
+    clients = state.add_clients(list(range(1, args.accounts + 1)))
+    bank_ids = [index % args.banks + 1 for index in range(args.accounts)]
+    accounts = state.open_accounts(bank_ids, list(clients))
+
+    deposits = list(accounts), [args.initial_balance] * args.accounts
+    state.apply_tick(deposits=deposits)
+    initial_total = state.total_money()
+
+    seeded = time.perf_counter()
+
+    share = args.ops_per_tick // 10
+    applied = rejected = 0
+    deposited = withdrawn = 0
+
+    for _ in range(args.ticks):
+        deposit_ids, _, deposit_amounts = random_columns(rng, share, args.accounts, args.max_amount)
+        withdraw_ids, _, withdraw_amounts = random_columns(rng, share, args.accounts, args.max_amount)
+        from_ids, to_ids, amounts = random_columns(rng, args.ops_per_tick - 2 * share, args.accounts, args.max_amount)
+
+        result = state.apply_tick(
+            deposits=(deposit_ids, deposit_amounts),
+            withdrawals=(withdraw_ids, withdraw_amounts),
+            transfers=(from_ids, to_ids, amounts),
+        )
+
+        for accepted in (result.deposits, result.withdrawals, result.transfers):
+            accepted_count = int(np.count_nonzero(accepted)) if state.use_numpy else sum(accepted)
+            applied += accepted_count
+            rejected += len(accepted) - accepted_count
+        deposited += accepted_total(deposit_amounts, result.deposits)
+        withdrawn += accepted_total(withdraw_amounts, result.withdrawals)
+
+    elapsed = time.perf_counter() - seeded
+    operations = args.ticks * args.ops_per_tick
+
+    return state, {
+        "backend": "numpy" if state.use_numpy else "array",
+        "accounts": args.accounts,
+        "ticks": args.ticks,
+        "operations": operations,
+        "applied": applied,
+        "rejected": rejected,
+        "seed_seconds": round(seeded - started, 3),
+        "seconds": round(elapsed, 3),
+        "throughput_ops": round(operations / elapsed, 1) if elapsed else 0.0,
+        # Transfers move money between accounts and into bank comission only.
+        "money_conserved": state.total_money() == initial_total + deposited - withdrawn,
+    }
+
+
+async def export(state: SimulationState) -> float:
+    from app.db.database import EngineProfile, dispose_engines, get_session_maker
+    from app.simulation.export import export_state
+
+    started = time.perf_counter()
+    async with get_session_maker(EngineProfile.batch)() as session:
+        await export_state(session, state)
+    await dispose_engines()
+
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--banks", type=int, default=5)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--ops-per-tick", type=int, default=100_000)
+    parser.add_argument("--initial-balance", type=int, default=100_000, help="cents")
+    parser.add_argument("--max-amount", type=int, default=10_000, help="cents")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-numpy", action="store_true", help="use the array.array backend")
+    parser.add_argument("--export", action="store_true", help="persist the final state to the database")
+    args = parser.parse_args()
+
+    state, report = run(args)
+    if args.export:
+        report["export_seconds"] = round(asyncio.run(export(state)), 3)
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,116 @@
+"""Cold-start cost of importing the service layer.
+
+Imports each target in a fresh interpreter --repeat times and prints a JSON
+report with the median and fastest wall time, the bare interpreter as a
+baseline, and whether the import pulled in the database driver or parsed
+settings (both should wait for first use):
+
+    python -m bench.startup --repeat 20 --top 10
+
+--first-query also times opening the first session and running SELECT 1,
+which needs a reachable database.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+TARGETS = [
+    "app.db.database",
+    "app.services.client_service",
+    "app.services.transaction_service",
+    "app.jobs.accrual",
+    "app.jobs.reconcile",
+]
+
+PROBE = """
+import sys
+from app.core.config import settings
+from app.core.lazy import is_resolved
+print(int("asyncpg" in sys.modules), int(is_resolved(settings)))
+"""
+
+FIRST_QUERY = """
+import asyncio, time
+started = time.perf_counter()
+from sqlalchemy import text
+from app.db.database import async_session_maker, dispose_engines
+
+async def main():
+    async with async_session_maker() as session:
+        await session.execute(text("SELECT 1"))
+    await dispose_engines()
+
+asyncio.run(main())
+print(time.perf_counter() - started)
+"""
+
+
+def run(code: str) -> tuple[float, str]:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, result.stdout
+
+
+def timings(code: str, repeat: int) -> dict:
+    samples = [run(code)[0] for _ in range(repeat)]
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+    }
+
+
+def slowest_imports(target: str, top: int) -> list[dict]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Direct imports of the target module; their cumulative time covers the rest.
+        if len(name) - len(name.lstrip()) == 3:
+            rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def main(args: argparse.Namespace) -> dict:
+    report = {"interpreter": timings("pass", args.repeat), "imports": {}}
+
+    for target in args.targets:
+        _, probe = run(f"import {target}\n{PROBE}")
+        driver_loaded, settings_parsed = (bool(int(flag)) for flag in probe.split())
+        report["imports"][target] = {
+            **timings(f"import {target}", args.repeat),
+            "driver_loaded": driver_loaded,
+            "settings_parsed": settings_parsed,
+        }
+        if args.top:
+            report["imports"][target]["slowest"] = slowest_imports(target, args.top)
+
+    if args.first_query:
+        samples = [float(run(FIRST_QUERY)[1]) for _ in range(args.repeat)]
+        report["first_query"] = {
+            "median_ms": round(statistics.median(samples) * 1000, 1),
+            "min_ms": round(min(samples) * 1000, 1),
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=TARGETS, help="modules to import")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=0, help="list the N slowest direct imports of each target")
+    parser.add_argument("--first-query", action="store_true", help="also time the first SELECT 1 (needs a database)")
+    args = parser.parse_args()
+
+    print(json.dumps(main(args), indent=2))